@@ -4,26 +4,56 @@ Personagem principal: uma zebra!
 Controles: Setas ← → para mover, Espaço/↑ para pular
 """
 
+import time
+_START = time.perf_counter()  # Início do import, para medir o startup
+
 import pygame
+import os
 import sys
+import argparse
 import math
 import random
 import struct
 import array
+import bisect
+import hashlib
+import json
+import mmap
+import re
+import gc
+import threading
+from collections import OrderedDict, deque, namedtuple
+
+try:
+    import numpy as np
+except ImportError:  # Sem numpy, a síntese de som usa o laço em Python puro
+    np = None
 
 # ─────────────────────────────────────────────
 # Inicialização
 # ─────────────────────────────────────────────
-pygame.init()
-pygame.mixer.init(frequency=22050, size=-16, channels=1, buffer=512)
-
 SCREEN_W, SCREEN_H = 800, 600
 TILE = 40
-FPS = 60
-
-screen = pygame.display.set_mode((SCREEN_W, SCREEN_H))
-pygame.display.set_caption("🦓 SUPER ZEBRA 🦓")
-clock = pygame.time.Clock()
+FPS = 60                     # passos de simulação por segundo
+SIM_DT_MS = 1000.0 / FPS     # duração de um passo fixo
+MAX_CATCHUP_STEPS = 5        # passos simulados por frame desenhado, no máximo
+SAMPLE_RATE = 22050
+
+# Janela e mixer só existem depois de init_display()/init_audio(); importar
+# o módulo (ou rodar a simulação headless) não abre nenhum dos dois.
+screen = None
+clock = None
+
+
+def init_display():
+    """Abre a janela do jogo e devolve a superfície da tela."""
+    global screen, clock
+    pygame.display.init()
+    pygame.font.init()
+    screen = pygame.display.set_mode((SCREEN_W, SCREEN_H))
+    pygame.display.set_caption("🦓 SUPER ZEBRA 🦓")
+    clock = pygame.time.Clock()
+    return screen
 
 # ─────────────────────────────────────────────
 # Cores
@@ -60,107 +90,442 @@ FLAG_GREEN   = (0, 200, 60)
 FLAG_POLE    = (160, 160, 160)
 HILL_GREEN   = (60, 170, 60)
 HILL_DARK    = (40, 140, 40)
+COLORKEY     = (255, 0, 255)  # Transparência das camadas pré-renderizadas
 
 # ─────────────────────────────────────────────
 # Geração de Sons (sintetizados)
 # ─────────────────────────────────────────────
+# Um som é descrito por uma SoundSpec:
+#   wave      'square', 'sine' ou 'saw'
+#   amp       amplitude de pico (amostras de 16 bits)
+#   duration  duração em segundos
+#   sweep     segmentos (t_inicio, f0, f1); dentro de cada um a frequência é
+#             f0 + (f1 - f0) * t / duration
+#   fade      envelope = clamp(1 - fade * t / duration, 0, 1) ** fade_pow
+#   samples   None, ou o número exato de amostras a SAMPLE_RATE; aí o
+#             envelope usa i / samples no lugar de t / duration (como o
+#             generate_sound original), o que difere quando rate * duration
+#             não é inteiro
+SoundSpec = namedtuple('SoundSpec', 'wave amp duration sweep fade fade_pow samples',
+                       defaults=(None,))
+
+JUMP_SOUND = SoundSpec('sine', 8000, 0.15, ((0.0, 300, 1100),), 1.0, 1)
+COIN_SOUND = SoundSpec('sine', 6000, 0.2, ((0.0, 988, 988), (0.1, 1319, 1319)), 1.0, 1)
+STOMP_SOUND = SoundSpec('sine', 8000, 0.12, ((0.0, 400, 100),), 1.0, 1)
+DIE_SOUND = SoundSpec('sine', 7000, 0.6, ((0.0, 400, 50),), 1.0, 2)
+POWERUP_SOUND = SoundSpec('sine', 5000, 0.4, ((0.0, 500, 1100),), 0.5, 1)
+
+SYNTH_VERSION = 2
+# Cache em disco dos PCMs já sintetizados; SUPER_ZEBRA_CACHE="" desliga
+CACHE_DIR = os.environ.get('SUPER_ZEBRA_CACHE',
+                           os.path.join(os.path.expanduser('~'), '.cache', 'super_zebra'))
+
+
+def _wave_numpy(wave, amp, freq, t):
+    """Forma de onda ('square', 'sine' ou 'saw') nos instantes `t` (arrays)."""
+    if wave == 'square':
+        return np.where(np.sin(2 * np.pi * freq * t) >= 0, amp, -amp)
+    if wave == 'sine':
+        return np.trunc(amp * np.sin(2 * np.pi * freq * t))
+    cycles = t * freq
+    return np.trunc(amp * (2 * (cycles - np.floor(cycles + 0.5))))
+
+
+def _wave_python(wave, amp, freq, t):
+    """Como _wave_numpy, para uma amostra."""
+    if wave == 'square':
+        return amp if math.sin(2 * math.pi * freq * t) >= 0 else -amp
+    if wave == 'sine':
+        return int(amp * math.sin(2 * math.pi * freq * t))
+    return int(amp * (2 * (t * freq - math.floor(t * freq + 0.5))))
+
+
+def _n_samples(spec, rate):
+    if spec.samples is None:
+        return int(rate * spec.duration)
+    return spec.samples * rate // SAMPLE_RATE
+
+
+def _synth_numpy(spec, rate):
+    n = _n_samples(spec, rate)
+    t = np.arange(n) / rate
+    freq = np.empty(n)
+    starts = [seg[0] for seg in spec.sweep] + [spec.duration]
+    for (t0, f0, f1), t1 in zip(spec.sweep, starts[1:]):
+        mask = (t >= t0) & (t < t1)
+        freq[mask] = f0 + (f1 - f0) * t[mask] / spec.duration
+    val = _wave_numpy(spec.wave, spec.amp, freq, t)
+    if spec.samples is not None:
+        env = np.clip(1 - np.arange(n) / n * spec.fade, 0, 1) ** spec.fade_pow
+    else:
+        env = np.clip(1 - spec.fade * t / spec.duration, 0, 1) ** spec.fade_pow
+    return np.trunc(val * env).astype(np.int16).tobytes()
+
+
+def _synth_python(spec, rate):
+    n = _n_samples(spec, rate)
+    buf = array.array('h', [0] * n)
+    starts = [seg[0] for seg in spec.sweep[1:]]
+    for i in range(n):
+        t = i / rate
+        seg = 0
+        while seg < len(starts) and t >= starts[seg]:
+            seg += 1
+        _, f0, f1 = spec.sweep[seg]
+        freq = f0 + (f1 - f0) * t / spec.duration
+        val = _wave_python(spec.wave, spec.amp, freq, t)
+        if spec.samples is not None:
+            env = min(max(1 - i / n * spec.fade, 0), 1) ** spec.fade_pow
+        else:
+            env = min(max(1 - spec.fade * t / spec.duration, 0), 1) ** spec.fade_pow
+        buf[i] = int(val * env)
+    return buf.tobytes()
+
+
+def synth_pcm(spec, rate=SAMPLE_RATE):
+    """Sintetiza o som inteiro (PCM 16 bits mono, ordem de bytes nativa)."""
+    if np is not None:
+        return _synth_numpy(spec, rate)
+    return _synth_python(spec, rate)
+
+
+def render_pcm(spec, rate=SAMPLE_RATE, cache_dir=None):
+    """Como synth_pcm, mas consulta/preenche o cache em disco.
+
+    A chave é o hash dos parâmetros de síntese, então mudar um som (ou o
+    próprio sintetizador, via SYNTH_VERSION) nunca reaproveita um PCM velho.
+    """
+    if cache_dir is None:
+        cache_dir = CACHE_DIR
+    if not cache_dir:
+        return synth_pcm(spec, rate)
+    key = hashlib.sha1(repr((SYNTH_VERSION, rate, sys.byteorder, tuple(spec))).encode()).hexdigest()
+    path = os.path.join(cache_dir, 'sounds', key + '.pcm')
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except OSError:
+        pass
+    pcm = synth_pcm(spec, rate)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = '%s.%d.tmp' % (path, os.getpid())
+        with open(tmp, 'wb') as f:
+            f.write(pcm)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+    return pcm
+
+
+def make_sound(spec):
+    return pygame.mixer.Sound(buffer=render_pcm(spec))
+
+
+def tone_spec(frequency, duration_ms, volume=0.3, wave_type='square'):
+    """SoundSpec de um tom simples com fade-out."""
+    return SoundSpec(wave_type, int(32767 * volume), duration_ms / 1000,
+                     ((0.0, frequency, frequency),), 1.5, 1,
+                     int(SAMPLE_RATE * duration_ms / 1000))
+
+
 def generate_sound(frequency, duration_ms, volume=0.3, wave_type='square'):
     """Gera um som sintetizado."""
-    sample_rate = 22050
-    n_samples = int(sample_rate * duration_ms / 1000)
-    buf = array.array('h', [0] * n_samples)
-    max_amp = int(32767 * volume)
-    for i in range(n_samples):
-        t = i / sample_rate
-        if wave_type == 'square':
-            val = max_amp if math.sin(2 * math.pi * frequency * t) >= 0 else -max_amp
-        elif wave_type == 'sine':
-            val = int(max_amp * math.sin(2 * math.pi * frequency * t))
-        else:
-            val = int(max_amp * (2 * (t * frequency - math.floor(t * frequency + 0.5))))
-        # Fade out
-        fade = max(0, 1 - (i / n_samples) * 1.5)
-        buf[i] = int(val * min(fade, 1.0))
-    sound = pygame.mixer.Sound(buffer=buf)
-    return sound
+    return make_sound(tone_spec(frequency, duration_ms, volume, wave_type))
 
 def generate_jump_sound():
-    sample_rate = 22050
-    duration = 0.15
-    n = int(sample_rate * duration)
-    buf = array.array('h', [0] * n)
-    for i in range(n):
-        t = i / sample_rate
-        freq = 300 + (800 * t / duration)
-        val = int(8000 * math.sin(2 * math.pi * freq * t))
-        fade = 1 - t / duration
-        buf[i] = int(val * fade)
-    return pygame.mixer.Sound(buffer=buf)
+    return make_sound(JUMP_SOUND)
 
 def generate_coin_sound():
-    sample_rate = 22050
-    duration = 0.2
-    n = int(sample_rate * duration)
-    buf = array.array('h', [0] * n)
-    for i in range(n):
-        t = i / sample_rate
-        if t < 0.1:
-            freq = 988
-        else:
-            freq = 1319
-        val = int(6000 * math.sin(2 * math.pi * freq * t))
-        fade = 1 - t / duration
-        buf[i] = int(val * fade)
-    return pygame.mixer.Sound(buffer=buf)
+    return make_sound(COIN_SOUND)
 
 def generate_stomp_sound():
-    sample_rate = 22050
-    duration = 0.12
-    n = int(sample_rate * duration)
-    buf = array.array('h', [0] * n)
-    for i in range(n):
-        t = i / sample_rate
-        freq = 400 - (300 * t / duration)
-        val = int(8000 * math.sin(2 * math.pi * freq * t))
-        fade = 1 - t / duration
-        buf[i] = int(val * fade)
-    return pygame.mixer.Sound(buffer=buf)
+    return make_sound(STOMP_SOUND)
 
 def generate_die_sound():
-    sample_rate = 22050
-    duration = 0.6
-    n = int(sample_rate * duration)
-    buf = array.array('h', [0] * n)
-    for i in range(n):
-        t = i / sample_rate
-        freq = 400 - (350 * t / duration)
-        val = int(7000 * math.sin(2 * math.pi * freq * t))
-        fade = 1 - (t / duration)
-        buf[i] = int(val * fade * fade)
-    return pygame.mixer.Sound(buffer=buf)
+    return make_sound(DIE_SOUND)
 
 def generate_powerup_sound():
-    sample_rate = 22050
-    duration = 0.4
-    n = int(sample_rate * duration)
-    buf = array.array('h', [0] * n)
-    for i in range(n):
-        t = i / sample_rate
-        freq = 500 + 600 * (t / duration)
-        val = int(5000 * math.sin(2 * math.pi * freq * t))
-        fade = 1 - (t / duration) * 0.5
-        buf[i] = int(val * fade)
-    return pygame.mixer.Sound(buffer=buf)
+    return make_sound(POWERUP_SOUND)
+
+# Nome do evento da simulação -> som tocado pelo jogo interativo
+SOUND_SPECS = {
+    'jump': JUMP_SOUND,
+    'coin': COIN_SOUND,
+    'stomp': STOMP_SOUND,
+    'die': DIE_SOUND,
+    'powerup': POWERUP_SOUND,
+    'flag': tone_spec(523, 600, 0.2, 'sine'),
+}
+sounds = {}
+audio_enabled = None  # None = mixer ainda não foi tentado
+
+
+def init_audio():
+    """Abre o mixer na primeira chamada; devolve se há áudio (senão, fica mudo)."""
+    global audio_enabled
+    if audio_enabled is None:
+        try:
+            pygame.mixer.init(frequency=SAMPLE_RATE, size=-16, channels=1, buffer=512)
+            audio_enabled = True
+        except Exception:
+            audio_enabled = False
+    return audio_enabled
+
+
+def load_sound(name):
+    """Sintetiza (ou lê do cache) o som na primeira vez que ele é pedido."""
+    snd = sounds.get(name)
+    if snd is None and init_audio():
+        try:
+            snd = sounds[name] = make_sound(SOUND_SPECS[name])
+        except Exception:
+            return None
+    return snd
+
+
+def play_sound(name):
+    snd = load_sound(name)
+    if snd:
+        snd.play()
 
-try:
-    snd_jump = generate_jump_sound()
-    snd_coin = generate_coin_sound()
-    snd_stomp = generate_stomp_sound()
-    snd_die = generate_die_sound()
-    snd_powerup = generate_powerup_sound()
-    snd_flag = generate_sound(523, 600, 0.2, 'sine')
-except Exception:
-    snd_jump = snd_coin = snd_stomp = snd_die = snd_powerup = snd_flag = None
+
+# ─────────────────────────────────────────────
+# Música procedural (streaming)
+# ─────────────────────────────────────────────
+MUSIC_CHANNEL = 0   # canal do mixer reservado para a música
+MUSIC_BLOCK = 2048  # amostras por buffer (~93 ms a 22050 Hz)
+MUSIC_AHEAD = 4     # buffers sintetizados à frente do que está tocando
+MUSIC_POLL = 0.02   # intervalo (s) em que a thread confere o canal
+
+# Voz: forma de onda do SoundSpec ('square', 'sine', 'saw'), volume, queda
+# do envelope por segundo e partitura em semicolcheias: uma nota ('C5',
+# 'F#3'), '-' para segurar a anterior ou '.' para pausa.
+MusicVoice = namedtuple('MusicVoice', 'wave amp decay score')
+MusicTrack = namedtuple('MusicTrack', 'bpm voices')
+
+MUSIC_THEME = MusicTrack(144, (
+    MusicVoice('square', 2600, 2.0,
+               "E5 - G5 - C6 - - - G5 - E5 - G5 - - - "
+               "A5 - - - C6 - A5 - E5 - - - . . . . "
+               "F5 - A5 - C6 - A5 - F5 - A5 - C6 - - - "
+               "B5 - - - D6 - B5 - G5 - - - . . . ."),
+    MusicVoice('saw', 3400, 3.0,
+               "C3 - . C3 G2 - . G2 C3 - . C3 G2 - . G2 "
+               "A2 - . A2 E3 - . E3 A2 - . A2 E3 - . E3 "
+               "F2 - . F2 C3 - . C3 F2 - . F2 C3 - . C3 "
+               "G2 - . G2 D3 - . D3 G2 - . G2 B2 - . B2"),
+    MusicVoice('sine', 2200, 6.0,
+               "C4 E4 G4 E4 C4 E4 G4 E4 C4 E4 G4 E4 C4 E4 G4 E4 "
+               "A3 C4 E4 C4 A3 C4 E4 C4 A3 C4 E4 C4 A3 C4 E4 C4 "
+               "F3 A3 C4 A3 F3 A3 C4 A3 F3 A3 C4 A3 F3 A3 C4 A3 "
+               "G3 B3 D4 B3 G3 B3 D4 B3 G3 B3 D4 B3 G3 B3 D4 B3"),
+))
+
+_NOTE_SEMITONES = {'C': 0, 'D': 2, 'E': 4, 'F': 5, 'G': 7, 'A': 9, 'B': 11}
+
+
+def note_freq(name):
+    """Frequência de uma nota como 'A4' (440 Hz), 'F#3' ou 'Bb2'."""
+    accidental = name[1:-1]
+    semis = _NOTE_SEMITONES[name[0]] + accidental.count('#') - accidental.count('b')
+    midi = 12 * (int(name[-1]) + 1) + semis
+    return 440.0 * 2 ** ((midi - 69) / 12)
+
+
+def music_schedule(track, rate=SAMPLE_RATE):
+    """Notas de cada voz como [início, fim, freq] (em amostras) e a duração do loop."""
+    step = int(round(rate * 60 / (track.bpm * 4)))
+    voices = []
+    length = 0
+    for voice in track.voices:
+        tokens = voice.score.split()
+        notes = []
+        for i, tok in enumerate(tokens):
+            if tok == '-':
+                if notes and notes[-1][1] == i * step:
+                    notes[-1][1] += step
+            elif tok != '.':
+                notes.append([i * step, (i + 1) * step, note_freq(tok)])
+        voices.append(notes)
+        length = max(length, len(tokens) * step)
+    return voices, length
+
+
+class MusicRenderer:
+    """Sintetiza a trilha bloco a bloco, em loop, sem gerar a música inteira.
+
+    Cada bloco continua exatamente de onde o anterior parou (a fase de cada
+    nota é medida desde o seu início), então os buffers emendam sem estalo.
+    """
+
+    def __init__(self, track, rate=SAMPLE_RATE):
+        self.track = track
+        self.rate = rate
+        self.notes, self.length = music_schedule(track, rate)
+        self.starts = [[n[0] for n in notes] for notes in self.notes]
+        self.pos = 0  # amostra do loop onde começa o próximo bloco
+
+    def render(self, n):
+        """Próximas `n` amostras (PCM 16 bits mono, ordem de bytes nativa)."""
+        mix = np.zeros(n) if np is not None else [0.0] * n
+        done = 0
+        while done < n:
+            a = self.pos
+            b = min(self.length, a + n - done)
+            for voice, notes, starts in zip(self.track.voices, self.notes, self.starts):
+                i = max(0, bisect.bisect_right(starts, a) - 1)
+                while i < len(notes) and notes[i][0] < b:
+                    s, e, freq = notes[i]
+                    lo, hi = max(a, s), min(b, e)
+                    if lo < hi:
+                        self._voice(mix, done + lo - a, voice, freq, lo - s, hi - lo)
+                    i += 1
+            done += b - a
+            self.pos = b % self.length
+        if np is not None:
+            return np.clip(mix, -32768, 32767).astype(np.int16).tobytes()
+        return array.array('h', [int(min(max(v, -32768), 32767)) for v in mix]).tobytes()
+
+    def _voice(self, mix, out, voice, freq, offset, n):
+        """Soma em mix[out:out+n] o trecho da nota a partir de `offset` amostras."""
+        if np is not None:
+            t = (np.arange(n) + offset) / self.rate
+            env = np.maximum(1 - voice.decay * t, 0)
+            mix[out:out + n] += _wave_numpy(voice.wave, voice.amp, freq, t) * env
+            return
+        for k in range(n):
+            t = (offset + k) / self.rate
+            env = max(1 - voice.decay * t, 0)
+            mix[out + k] += _wave_python(voice.wave, voice.amp, freq, t) * env
+
+
+class MusicStreamer:
+    """Toca uma trilha em loop num canal reservado do mixer, via uma thread.
+
+    A thread sintetiza até MUSIC_AHEAD blocos à frente numa fila e, sempre
+    que a fila do canal esvazia, enfileira o próximo. O loop principal só
+    chama start()/stop(), que nunca esperam a síntese. Se o canal ficar mudo
+    (a thread atrasou), a música volta a partir do próximo bloco e o furo é
+    contado em `underruns`.
+    """
+
+    def __init__(self, track):
+        self.track = track
+        self.underruns = 0
+        self._lock = threading.Lock()  # serializa o uso do mixer com stop()
+        self._stop = None              # evento da thread atual (None = parado)
+        self._channel = None
+
+    @property
+    def playing(self):
+        return self._stop is not None
+
+    def start(self):
+        """Recomeça a trilha do início; devolve False se não há áudio."""
+        self.stop()
+        if not init_audio():
+            return False
+        if self._channel is None:
+            pygame.mixer.set_reserved(MUSIC_CHANNEL + 1)  # play_sound() não usa o canal
+            self._channel = pygame.mixer.Channel(MUSIC_CHANNEL)
+        stop = self._stop = threading.Event()
+        threading.Thread(target=self._feed, args=(MusicRenderer(self.track), stop),
+                         name='music', daemon=True).start()
+        return True
+
+    def stop(self):
+        """Cala o canal; a thread sai sozinha sem tocar mais no mixer."""
+        with self._lock:
+            if self._stop is not None:
+                self._stop.set()
+                self._stop = None
+                self._channel.stop()
+
+    def _feed(self, renderer, stop):
+        ready = deque()
+        started = False
+        try:
+            while not stop.is_set():
+                # A síntese (a parte cara) fica fora da trava
+                while len(ready) < MUSIC_AHEAD:
+                    ready.append(renderer.render(MUSIC_BLOCK))
+                with self._lock:
+                    if stop.is_set():
+                        break
+                    channel = self._channel
+                    if not channel.get_busy():
+                        if started:
+                            self.underruns += 1
+                        channel.play(pygame.mixer.Sound(buffer=ready.popleft()))
+                        started = True
+                    if channel.get_queue() is None:
+                        channel.queue(pygame.mixer.Sound(buffer=ready.popleft()))
+                stop.wait(MUSIC_POLL)
+        except pygame.error:
+            pass  # mixer fechado por fora: a música só para
+
+
+# ─────────────────────────────────────────────
+# Fontes e textos
+# ─────────────────────────────────────────────
+TEXT_CACHE_SIZE = 256
+
+
+class FontRegistry:
+    """Resolve cada fonte (face, tamanho, estilo) uma única vez.
+
+    Também guarda textos já renderizados (glifos como "$" e "?"), para que
+    o jogo em regime normal não crie fontes nem superfícies de texto.
+    """
+
+    def __init__(self, max_texts=TEXT_CACHE_SIZE):
+        self.max_texts = max_texts
+        self.fonts_created = 0
+        self.surfaces_created = 0
+        self._fonts = {}
+        self._texts = OrderedDict()
+
+    def font(self, face, size, bold=False, italic=False):
+        key = (face, size, bold, italic)
+        font = self._fonts.get(key)
+        if font is None:
+            if not pygame.font.get_init():
+                pygame.font.init()
+            font = pygame.font.SysFont(face, size, bold=bold, italic=italic)
+            self._fonts[key] = font
+            self.fonts_created += 1
+        return font
+
+    def render(self, text, face, size, color, bold=False, italic=False):
+        """Devolve a superfície (compartilhada) do texto renderizado."""
+        key = (text, face, size, bold, italic, color)
+        surf = self._texts.get(key)
+        if surf is not None:
+            self._texts.move_to_end(key)
+            return surf
+        surf = self.font(face, size, bold, italic).render(text, True, color)
+        self.surfaces_created += 1
+        self._texts[key] = surf
+        if len(self._texts) > self.max_texts:
+            self._texts.popitem(last=False)
+        return surf
+
+    def render_uncached(self, text, face, size, color, bold=False, italic=False):
+        """Renderiza fora do cache de textos (quem chama guarda ou descarta).
+
+        A superfície conta em `surfaces_created` como as do cache.
+        """
+        self.surfaces_created += 1
+        return self.font(face, size, bold, italic).render(text, True, color)
+
+    def stats(self):
+        return {'fonts_created': self.fonts_created,
+                'surfaces_created': self.surfaces_created,
+                'texts_cached': len(self._texts)}
+
+
+fonts = FontRegistry()
 
 
 # ─────────────────────────────────────────────
@@ -169,6 +534,16 @@ except Exception:
 
 def draw_zebra_sprite(w, h, frame=0, facing_right=True, jumping=False):
     """Desenha a zebra pixel-art."""
+    leg_phase = frame * 0.3 if frame > 0 else None
+    tail_phase = frame * 0.2 if frame else None
+    return _draw_zebra_pose(w, h, leg_phase, tail_phase, facing_right, jumping)
+
+
+def _draw_zebra_pose(w, h, leg_phase, tail_phase, facing_right, jumping):
+    """Desenha a zebra numa pose dada pelas fases (radianos) das pernas e da cauda.
+
+    Fase None = pose parada (frame 0).
+    """
     surf = pygame.Surface((w, h), pygame.SRCALPHA)
 
     body_w = int(w * 0.7)
@@ -262,8 +637,8 @@ def draw_zebra_sprite(w, h, frame=0, facing_right=True, jumping=False):
         for i, ox in enumerate(offsets):
             lx = body_x + int(body_w * ox) - leg_w // 2
             anim_offset = 0
-            if frame > 0:
-                anim_offset = int(math.sin((frame * 0.3) + i * math.pi * 0.5) * 6)
+            if leg_phase is not None:
+                anim_offset = int(math.sin(leg_phase + i * math.pi * 0.5) * 6)
             foot_y = leg_y + leg_h
             pygame.draw.line(surf, ZEBRA_BLACK, (lx + leg_w // 2, leg_y),
                              (lx + leg_w // 2 + anim_offset, foot_y), 4)
@@ -276,7 +651,7 @@ def draw_zebra_sprite(w, h, frame=0, facing_right=True, jumping=False):
     else:
         tail_x = body_x + body_w
     tail_y = body_y + 5
-    tail_wave = math.sin(frame * 0.2) * 5 if frame else 0
+    tail_wave = math.sin(tail_phase) * 5 if tail_phase is not None else 0
     tail_dir = -1 if facing_right else 1
     tail_points = [
         (tail_x, tail_y),
@@ -291,6 +666,11 @@ def draw_zebra_sprite(w, h, frame=0, facing_right=True, jumping=False):
 
 def draw_turtle_sprite(w, h, frame=0, alive=True):
     """Desenha o inimigo tartaruga."""
+    return _draw_turtle_pose(w, h, frame * 0.3, alive)
+
+
+def _draw_turtle_pose(w, h, phase, alive):
+    """Desenha a tartaruga com as pernas na fase (radianos) dada."""
     surf = pygame.Surface((w, h), pygame.SRCALPHA)
     if not alive:
         # Shell only (pisado)
@@ -321,7 +701,7 @@ def draw_turtle_sprite(w, h, frame=0, alive=True):
 
     # Pernas
     leg_y = sy + shell_h - 2
-    anim = int(math.sin(frame * 0.3) * 3)
+    anim = int(math.sin(phase) * 3)
     pygame.draw.ellipse(surf, TURTLE_GREEN, (sx + 4, leg_y, 8, 10 + anim))
     pygame.draw.ellipse(surf, TURTLE_GREEN, (sx + shell_w - 12, leg_y, 8, 10 - anim))
 
@@ -339,8 +719,7 @@ def draw_coin_sprite(w, h, frame=0):
     pygame.draw.ellipse(surf, COIN_COL, (cx, cy, coin_w, coin_h))
     pygame.draw.ellipse(surf, COIN_DARK, (cx, cy, coin_w, coin_h), 2)
     if coin_w > 10:
-        font_small = pygame.font.SysFont('Arial', 14, bold=True)
-        txt = font_small.render("$", True, COIN_DARK)
+        txt = fonts.render("$", 'Arial', 14, COIN_DARK, bold=True)
         surf.blit(txt, (w // 2 - txt.get_width() // 2, h // 2 - txt.get_height() // 2))
     return surf
 
@@ -358,8 +737,7 @@ def draw_qblock_sprite(w, h, hit=False):
     pygame.draw.line(surf, WHITE, (2, 2), (w - 2, 2), 2)
     pygame.draw.line(surf, WHITE, (2, 2), (2, h - 2), 2)
     # "?"
-    font = pygame.font.SysFont('Arial', int(h * 0.6), bold=True)
-    txt = font.render("?", True, BRICK_COL)
+    txt = fonts.render("?", 'Arial', int(h * 0.6), BRICK_COL, bold=True)
     surf.blit(txt, (w // 2 - txt.get_width() // 2, h // 2 - txt.get_height() // 2))
     return surf
 
@@ -379,6 +757,15 @@ def draw_brick_sprite(w, h):
     return surf
 
 
+def draw_ground_sprite(w, h):
+    """Desenha um bloco de chão com grama."""
+    surf = pygame.Surface((w, h), pygame.SRCALPHA)
+    pygame.draw.rect(surf, GROUND_BR, (0, 0, w, h))
+    pygame.draw.rect(surf, GROUND_TOP, (0, 0, w, 6))
+    pygame.draw.rect(surf, (100, 65, 30), (0, 0, w, h), 1)
+    return surf
+
+
 def draw_pipe_sprite(w, h):
     """Desenha um cano verde."""
     surf = pygame.Surface((w, h), pygame.SRCALPHA)
@@ -410,6 +797,141 @@ def draw_flag_sprite(pole_h):
     return surf
 
 
+# ─────────────────────────────────────────────
+# Cache de poses (zebra e tartaruga)
+# ─────────────────────────────────────────────
+# As pernas e a cauda oscilam com math.sin(frame * k), então só existe um
+# conjunto pequeno de poses distintas. Quantizamos a fase da animação em
+# POSE_STEPS passos por ciclo e guardamos cada pose já desenhada.
+
+POSE_STEPS = 16
+SPRITE_CACHE_SIZE = 512
+
+
+class SpriteCache:
+    """Cache LRU limitado de superfícies, com contadores de acertos/erros."""
+
+    def __init__(self, max_items=SPRITE_CACHE_SIZE):
+        self.max_items = max_items
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        # Superfícies vindas do atlas: fora do LRU, nunca expulsas
+        self._pinned = {}
+
+    def pin(self, key, surf):
+        self._pinned[key] = surf
+
+    def get(self, key, build):
+        """Devolve a superfície de `key`, chamando `build()` se não existir."""
+        surf = self._items.get(key)
+        if surf is not None:
+            self._items.move_to_end(key)
+            self.hits += 1
+            return surf
+        surf = self._pinned.get(key)
+        if surf is not None:
+            self.hits += 1
+            return surf
+        self.misses += 1
+        surf = build()
+        self._items[key] = surf
+        if len(self._items) > self.max_items:
+            self._items.popitem(last=False)
+        return surf
+
+    def clear(self):
+        self._items.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        return {'items': len(self._items), 'pinned': len(self._pinned),
+                'hits': self.hits, 'misses': self.misses}
+
+
+sprite_cache = SpriteCache()
+
+
+def _pose_step(phase):
+    """Quantiza uma fase (radianos) num dos POSE_STEPS passos do ciclo."""
+    return int(round(phase / (2 * math.pi) * POSE_STEPS)) % POSE_STEPS
+
+
+def _step_phase(step):
+    """Fase (radianos) representativa de um passo; None continua None."""
+    if step is None:
+        return None
+    return step * 2 * math.pi / POSE_STEPS
+
+
+def _zebra_key(w, h, frame=0, facing_right=True, jumping=False):
+    # Pulando, as pernas ficam dobradas e não dependem do frame
+    leg = _pose_step(frame * 0.3) if frame > 0 and not jumping else None
+    tail = _pose_step(frame * 0.2) if frame else None
+    return ('zebra', w, h, leg, tail, facing_right, jumping)
+
+
+def _draw_zebra_key(key):
+    _, w, h, leg, tail, facing_right, jumping = key
+    return _draw_zebra_pose(w, h, _step_phase(leg), _step_phase(tail), facing_right, jumping)
+
+
+def _turtle_key(w, h, frame=0, alive=True):
+    return ('turtle', w, h, _pose_step(frame * 0.3) if alive else None, alive)
+
+
+def _draw_turtle_key(key):
+    _, w, h, step, alive = key
+    return _draw_turtle_pose(w, h, _step_phase(step) or 0.0, alive)
+
+
+def zebra_sprite(w, h, frame=0, facing_right=True, jumping=False):
+    """Versão em cache de draw_zebra_sprite (não altere a superfície devolvida)."""
+    key = _zebra_key(w, h, frame, facing_right, jumping)
+    return sprite_cache.get(key, lambda: _draw_zebra_key(key))
+
+
+def turtle_sprite(w, h, frame=0, alive=True):
+    """Versão em cache de draw_turtle_sprite (não altere a superfície devolvida)."""
+    key = _turtle_key(w, h, frame, alive)
+    return sprite_cache.get(key, lambda: _draw_turtle_key(key))
+
+
+# ─────────────────────────────────────────────
+# Tira de giro da moeda
+# ─────────────────────────────────────────────
+# A moeda "gira" com abs(math.sin(frame * 0.08)); meio ciclo (π) já cobre
+# todas as larguras. Cada tamanho ganha uma tira com COIN_SPIN_STEPS quadros
+# desenhados de uma vez, e desenhar uma moeda vira um único blit.
+
+COIN_SPIN_STEPS = 32
+
+_coin_strips = {}
+
+
+def _draw_coin_strip(w, h):
+    strip = pygame.Surface((w * COIN_SPIN_STEPS, h), pygame.SRCALPHA)
+    for i in range(COIN_SPIN_STEPS):
+        # frame tal que frame * 0.08 == i * π / COIN_SPIN_STEPS
+        frame = i * math.pi / COIN_SPIN_STEPS / 0.08
+        strip.blit(draw_coin_sprite(w, h, frame), (i * w, 0))
+    return strip
+
+
+def _split_coin_strip(strip, w, h):
+    return [strip.subsurface((i * w, 0, w, h)) for i in range(COIN_SPIN_STEPS)]
+
+
+def coin_sprite(w, h, frame=0):
+    """Quadro pré-renderizado da moeda (não altere a superfície devolvida)."""
+    frames = _coin_strips.get((w, h))
+    if frames is None:
+        frames = _coin_strips[(w, h)] = _split_coin_strip(_draw_coin_strip(w, h), w, h)
+    step = int(frame * 0.08 / math.pi * COIN_SPIN_STEPS) % COIN_SPIN_STEPS
+    return frames[step]
+
+
 # ─────────────────────────────────────────────
 # Desenho de Cenário (Background)
 # ─────────────────────────────────────────────
@@ -475,29 +997,400 @@ WORLD_H = LEVEL_H * TILE
 # ─────────────────────────────────────────────
 # Parsear o nível
 # ─────────────────────────────────────────────
+# Cada célula da grade é um byte: tipo nos bits baixos, flags nos altos
+T_EMPTY, T_GROUND, T_BRICK, T_QBLOCK = 0, 1, 2, 3
+TILE_TYPE_MASK = 0x0F
+TILE_HIT = 0x10          # bloco Q já atingido
+TILE_COIN_GIVEN = 0x20   # moeda do bloco Q já entregue
+TILE_NAMES = ('', 'ground', 'brick', 'qblock')
+# Caractere do mapa -> código do tile (o resto vira vazio)
+TILE_TABLE = bytes(
+    {ord('G'): T_GROUND, ord('B'): T_BRICK, ord('Q'): T_QBLOCK}.get(i, T_EMPTY)
+    for i in range(256))
+
+
 class Tile:
-    def __init__(self, tile_type, x, y, w=TILE, h=TILE):
-        self.type = tile_type
-        self.rect = pygame.Rect(x, y, w, h)
-        self.hit = False
-        self.coin_given = False
+    """Registro esparso de um tile com estado vivo (quicando).
+
+    Tipo e flags moram no byte da grade; o registro só guarda a célula e o
+    timer do bounce, e o retângulo é derivado das coordenadas.
+    """
+
+    def __init__(self, grid, col, row):
+        self.grid = grid
+        self.col = col
+        self.row = row
         self.bounce_timer = 0
 
-class Enemy:
-    def __init__(self, x, y):
-        self.rect = pygame.Rect(x, y, TILE, TILE)
-        self.vx = -1.5
-        self.vy = 0
-        self.alive = True
-        self.death_timer = 0
-        self.on_ground = False
-        self.frame = 0
+    @property
+    def code(self):
+        return self.grid.code(self.col, self.row)
+
+    @property
+    def type(self):
+        return TILE_NAMES[self.code & TILE_TYPE_MASK]
+
+    @property
+    def rect(self):
+        return pygame.Rect(self.col * TILE, self.row * TILE, TILE, TILE)
+
+    @property
+    def hit(self):
+        return bool(self.code & TILE_HIT)
+
+    @hit.setter
+    def hit(self, value):
+        self.grid.set_flag(self.col, self.row, TILE_HIT, value)
+
+    @property
+    def coin_given(self):
+        return bool(self.code & TILE_COIN_GIVEN)
+
+    @coin_given.setter
+    def coin_given(self, value):
+        self.grid.set_flag(self.col, self.row, TILE_COIN_GIVEN, value)
+
+
+class TileGrid:
+    """Grade densa de tiles: um byte por célula, em ordem de coluna.
+
+    A célula (col, row) fica em `types[col * rows + row]`, então um chunk
+    de colunas é uma fatia contígua. `query(rect)` devolve as células não
+    vazias que o retângulo toca, em ordem de linha e depois coluna — a
+    mesma da varredura completa do mapa —, então a resolução de colisões
+    (por exemplo, qual bloco Q é atingido por baixo) não muda. Só tiles
+    quicando têm um registro `Tile`, na lista `active`.
+    """
+
+    def __init__(self, cols, rows):
+        self.cols = cols
+        self.rows = rows
+        self.types = bytearray(cols * rows)
+        # Registros dos tiles quicando (ou com moeda pendente)
+        self.active = []
+        # Vista numpy (rows, cols) dos mesmos bytes, para a física em lote
+        if np is not None:
+            self.solid = np.frombuffer(self.types, np.uint8).reshape(cols, rows).T
+        else:
+            self.solid = None
+        # Muda a cada faixa de colunas gravada (as camadas em cache comparam)
+        self.version = 0
+        # Byte de carga de cada célula com flag mexida (snapshot guarda só elas)
+        self._pristine = {}
+
+    def fill(self, c0, columns):
+        """Grava as fatias `columns` (uma string por fileira) a partir de `c0`."""
+        rows = self.rows
+        for r, row in enumerate(columns):
+            data = row.encode('ascii').translate(TILE_TABLE)
+            self.types[c0 * rows + r:(c0 + len(data)) * rows:rows] = data
+        self.version += 1
+
+    def fill_codes(self, c0, codes):
+        """Grava colunas já em códigos, na ordem da grade, a partir de `c0`."""
+        i = c0 * self.rows
+        self.types[i:i + len(codes)] = codes
+        self.version += 1
+
+    def clear(self, c0, n):
+        """Zera as colunas [c0, c0 + n) (volta a faixa ao estado não carregado)."""
+        rows = self.rows
+        self.types[c0 * rows:(c0 + n) * rows] = bytes(n * rows)
+        self.version += 1
+
+    def code(self, col, row):
+        return self.types[col * self.rows + row]
+
+    def snapshot(self):
+        """Só o que a carga não refaz: células com flag mexida e tiles vivos.
+
+        O tamanho não depende do nível; as faixas carregadas ficam com
+        quem as carrega (StreamingLevel.filled).
+        """
+        types = self.types
+        return ({i: (orig, types[i]) for i, orig in self._pristine.items()},
+                [(t.col, t.row, t.bounce_timer) for t in self.active])
+
+    def restore(self, state):
+        cells, active = state
+        # No lugar: a vista numpy `solid` continua valendo
+        types = self.types
+        for i, orig in self._pristine.items():
+            if i not in cells:
+                types[i] = orig
+        for i, (_, value) in cells.items():
+            types[i] = value
+        self._pristine = {i: orig for i, (orig, _) in cells.items()}
+        self.active = []
+        for col, row, bounce in active:
+            t = Tile(self, col, row)
+            t.bounce_timer = bounce
+            self.active.append(t)
+        self.version += 1
+
+    def set_flag(self, col, row, flag, on=True):
+        i = col * self.rows + row
+        self._pristine.setdefault(i, self.types[i])
+        if on:
+            self.types[i] |= flag
+        else:
+            self.types[i] &= ~flag & 0xFF
+
+    def query(self, rect):
+        c0 = max(rect.left // TILE, 0)
+        c1 = min((rect.right - 1) // TILE, self.cols - 1)
+        r0 = max(rect.top // TILE, 0)
+        r1 = min((rect.bottom - 1) // TILE, self.rows - 1)
+        types = self.types
+        rows = self.rows
+        return [(col, row) for row in range(r0, r1 + 1) for col in range(c0, c1 + 1)
+                if types[col * rows + row]]
+
+    def activate(self, col, row):
+        """Registro do tile (col, row) na lista de tiles vivos."""
+        for t in self.active:
+            if t.col == col and t.row == row:
+                return t
+        t = Tile(self, col, row)
+        self.active.append(t)
+        return t
+
+
+# Inimigos além desta distância (px) das bordas da tela dormem
+ACTIVE_MARGIN = SCREEN_W // 2
+
+# Abaixo disso o laço escalar ganha do lote (overhead fixo do numpy por passo)
+ENEMY_BATCH_MIN = 64
+
+
+class EnemySystem:
+    """Todas as tartarugas em arrays contíguos, avançadas em lote.
+
+    Gravidade, movimento, virada na parede e pouso no chão são calculados
+    para todos os inimigos de uma vez sobre `TileGrid.solid`. A resolução
+    visita as mesmas células, na mesma ordem (linha, coluna), que a consulta
+    `TileGrid.query` do laço por objeto, então viradas e pousos são
+    idênticos. Sem numpy, cai nesse mesmo laço, inimigo por inimigo.
+    """
+    FIELDS = ('x', 'y', 'vx', 'vy', 'alive', 'death_timer', 'on_ground', 'frame', 'spawn')
+    DTYPES = ('i8', 'i8', 'f8', 'f8', '?', 'i8', '?', 'i8', 'i8')
+
+    def __init__(self, capacity=16):
+        self.count = 0
+        if np is not None:
+            for name, dtype in zip(self.FIELDS, self.DTYPES):
+                setattr(self, name, np.zeros(capacity, dtype))
+        else:
+            for name in self.FIELDS:
+                setattr(self, name, [])
+
+    def __len__(self):
+        return self.count
+
+    def add(self, x, y, spawn=-1):
+        """Novo inimigo em (x, y); `spawn` identifica a célula de origem."""
+        i = self.count
+        if np is not None:
+            if i == len(self.x):
+                for name in self.FIELDS:
+                    old = getattr(self, name)
+                    new = np.zeros(2 * len(old), old.dtype)
+                    new[:i] = old
+                    setattr(self, name, new)
+            self.x[i], self.y[i] = x, y
+            self.vx[i], self.vy[i] = -1.5, 0
+            self.alive[i], self.death_timer[i] = True, 0
+            self.on_ground[i], self.frame[i] = False, 0
+            self.spawn[i] = spawn
+        else:
+            for name, value in zip(self.FIELDS, (x, y, -1.5, 0, True, 0, False, 0, spawn)):
+                getattr(self, name).append(value)
+        self.count += 1
+        return i
+
+    def state(self):
+        """Campos dos inimigos como listas Python (para hash e comparação)."""
+        n = self.count
+        cast = {'i8': int, 'f8': float, '?': bool}
+        return [[cast[dtype](v) for v in getattr(self, name)[:n]]
+                for name, dtype in zip(self.FIELDS, self.DTYPES)]
+
+    def snapshot(self):
+        n = self.count
+        if np is not None:
+            return n, [getattr(self, name)[:n].copy() for name in self.FIELDS]
+        return n, [getattr(self, name)[:] for name in self.FIELDS]
+
+    def restore(self, state):
+        n, fields = state
+        self.count = n
+        for name, values in zip(self.FIELDS, fields):
+            if np is None:
+                setattr(self, name, values[:])
+                continue
+            arr = getattr(self, name)
+            if len(arr) < n:
+                arr = np.zeros(2 * n, arr.dtype)
+                setattr(self, name, arr)
+            arr[:n] = values
+
+    def discard(self, indices):
+        """Remove os inimigos `indices`, mantendo a ordem dos demais."""
+        if not indices:
+            return
+        n = self.count
+        gone = set(indices)
+        keep = [i for i in range(n) if i not in gone]
+        for name in self.FIELDS:
+            arr = getattr(self, name)
+            if np is not None:
+                arr[:len(keep)] = arr[keep]
+            else:
+                setattr(self, name, [arr[i] for i in keep])
+        self.count = len(keep)
+
+    def rect(self, i):
+        return pygame.Rect(int(self.x[i]), int(self.y[i]), TILE, TILE)
+
+    def alive_count(self):
+        return sum(1 for a in self.alive[:self.count] if a)
+
+    def touching(self, rect):
+        """Índices (em ordem) dos inimigos vivos que colidem com `rect`."""
+        n = self.count
+        if np is not None and n >= ENEMY_BATCH_MIN:
+            x, y = self.x[:n], self.y[:n]
+            hit = (self.alive[:n] & (x < rect.right) & (x + TILE > rect.left)
+                   & (y < rect.bottom) & (y + TILE > rect.top))
+            return np.flatnonzero(hit).tolist()
+        return [i for i in range(n) if self.alive[i] and rect.colliderect(self.rect(i))]
+
+    def visible(self, cam_x):
+        """Índices dos inimigos a desenhar (vivos ou mortos há pouco) na tela."""
+        n = self.count
+        if np is not None and n >= ENEMY_BATCH_MIN:
+            sx = self.x[:n] - cam_x
+            show = ((self.alive[:n] | (self.death_timer[:n] <= 30))
+                    & (sx > -TILE) & (sx < SCREEN_W + TILE))
+            return np.flatnonzero(show).tolist()
+        return [i for i in range(n)
+                if (self.alive[i] or self.death_timer[i] <= 30)
+                and -TILE < self.x[i] - cam_x < SCREEN_W + TILE]
+
+    def step(self, grid, awake=None):
+        """Avança um frame; com `awake=(x0, x1)`, só quem está nessa faixa.
+
+        Os de fora dormem: não caem, não andam e não animam, e continuam de
+        onde pararam quando a faixa volta a alcançá-los.
+        """
+        if np is not None and grid.solid is not None and self.count >= ENEMY_BATCH_MIN:
+            self._step_batched(grid, awake)
+        else:
+            self._step_scalar(grid, awake)
+
+    def _step_batched(self, grid, awake):
+        n = self.count
+        alive = self.alive[:n]
+        if awake is not None:
+            x = self.x[:n]
+            near = (x + TILE > awake[0]) & (x < awake[1])
+            self.death_timer[:n][~alive & near] += 1
+            idx = np.flatnonzero(alive & near)
+        else:
+            self.death_timer[:n][~alive] += 1
+            idx = np.flatnonzero(alive)
+        if not idx.size:
+            return
+        T = TILE
+        solid = grid.solid
+        rows, cols = solid.shape
+        self.frame[idx] += 1
+        x, y, vx = self.x[idx], self.y[idx], self.vx[idx]
+        vy = np.minimum(self.vy[idx] + 0.5, 8)
+        x += np.trunc(vx).astype(np.int64)
+
+        # X: janela de query(rect.inflate(2 * TILE, 0)), até 2 linhas x 4 colunas
+        r0 = np.maximum(y // T, 0)
+        r1 = np.minimum((y + T - 1) // T, rows - 1)
+        c0 = np.maximum((x - T) // T, 0)
+        c1 = np.minimum((x + 2 * T - 1) // T, cols - 1)
+        for k in range(2):
+            r = r0 + k
+            r_ok = r <= r1
+            rc = np.minimum(r, rows - 1)
+            for j in range(4):
+                c = c0 + j
+                hit = (r_ok & (c <= c1) & (solid[rc, np.minimum(c, cols - 1)] != 0)
+                       & (x < (c + 1) * T) & (x + T > c * T))
+                if hit.any():
+                    moving_right = vx > 0
+                    x = np.where(hit & moving_right, c * T - T, x)
+                    x = np.where(hit & ~moving_right, (c + 1) * T, x)
+                    vx = np.where(hit, -vx, vx)
+
+        # Y: janela de query(rect.inflate(0, 2 * TILE)), até 4 linhas x 2 colunas
+        y += np.trunc(vy).astype(np.int64)
+        on_ground = np.zeros(idx.size, bool)
+        r0 = np.maximum((y - T) // T, 0)
+        r1 = np.minimum((y + 2 * T - 1) // T, rows - 1)
+        c0 = np.maximum(x // T, 0)
+        c1 = np.minimum((x + T - 1) // T, cols - 1)
+        for k in range(4):
+            r = r0 + k
+            r_ok = r <= r1
+            rc = np.minimum(r, rows - 1)
+            for j in range(2):
+                c = c0 + j
+                land = (r_ok & (c <= c1) & (solid[rc, np.minimum(c, cols - 1)] != 0)
+                        & (y < (r + 1) * T) & (y + T > r * T) & (vy >= 0))
+                if land.any():
+                    y = np.where(land, r * T - T, y)
+                    vy = np.where(land, 0.0, vy)
+                    on_ground |= land
+
+        self.x[idx], self.y[idx], self.vx[idx], self.vy[idx] = x, y, vx, vy
+        self.on_ground[idx] = on_ground
+        # Fall off world
+        self.alive[idx] = y <= grid.rows * TILE + 50
+
+    def _step_scalar(self, grid, awake):
+        for i in range(self.count):
+            if awake is not None and not awake[0] - TILE < self.x[i] < awake[1]:
+                continue
+            if not self.alive[i]:
+                self.death_timer[i] += 1
+                continue
+            self.frame[i] += 1
+            vx = self.vx[i]
+            vy = min(self.vy[i] + 0.5, 8)
+            rect = self.rect(i)
+            rect.x += int(vx)
+            for col, row in grid.query(rect.inflate(2 * TILE, 0)):
+                if rect.colliderect((col * TILE, row * TILE, TILE, TILE)):
+                    if vx > 0:
+                        rect.right = col * TILE
+                    else:
+                        rect.left = (col + 1) * TILE
+                    vx *= -1
+            rect.y += int(vy)
+            on_ground = False
+            for col, row in grid.query(rect.inflate(0, 2 * TILE)):
+                if rect.colliderect((col * TILE, row * TILE, TILE, TILE)):
+                    if vy >= 0:
+                        rect.bottom = row * TILE
+                        vy = 0
+                        on_ground = True
+            self.x[i], self.y[i], self.vx[i], self.vy[i] = rect.x, rect.y, vx, vy
+            self.on_ground[i] = on_ground
+            if rect.top > grid.rows * TILE + 50:
+                self.alive[i] = False
+
 
 class Coin:
-    def __init__(self, x, y):
+    def __init__(self, x, y, rng=random, frame=None):
         self.rect = pygame.Rect(x + 8, y + 4, TILE - 16, TILE - 8)
         self.collected = False
-        self.frame = random.randint(0, 100)
+        self.frame = rng.randint(0, 100) if frame is None else frame
         self.x = x
         self.y = y
 
@@ -517,41 +1410,598 @@ class FlagPole:
         self.h = h
         self.touched = False
 
-class Particle:
-    def __init__(self, x, y, color):
-        self.x = x
-        self.y = y
-        self.vx = random.uniform(-3, 3)
-        self.vy = random.uniform(-5, -1)
-        self.timer = random.randint(15, 30)
-        self.color = color
+PARTICLE_CAPACITY = 4096
+STOMP_BURST = 24
+COIN_BURST = 15
+STOMP_COLORS = [TURTLE_GREEN, TURTLE_SHELL, WHITE]
+COIN_BURST_COLORS = [COIN_COL, COIN_DARK, WHITE]
+PARTICLE_PALETTE = [TURTLE_GREEN, TURTLE_SHELL, WHITE, COIN_COL, COIN_DARK]
+
+_particle_dots = {}
+
+
+class ParticleSystem:
+    """Partículas em arrays pré-alocados (posição, velocidade, timer, cor).
+
+    As vivas ficam compactadas em [0, count). `update` avança todas de uma
+    vez e remove as mortas em O(n), mantendo a ordem. Com o pool cheio, as
+    partículas novas é que são descartadas (contadas em `dropped`): as que
+    já estão na tela nunca somem antes da hora.
+    """
+
+    def __init__(self, capacity=PARTICLE_CAPACITY):
+        self.capacity = capacity
+        self.count = 0
+        self.dropped = 0
+        if np is not None:
+            self.x = np.zeros(capacity)
+            self.y = np.zeros(capacity)
+            self.vx = np.zeros(capacity)
+            self.vy = np.zeros(capacity)
+            self.timer = np.zeros(capacity, np.int32)
+            self.color = np.zeros(capacity, np.uint8)
+        else:
+            self.x = array.array('d', bytes(8 * capacity))
+            self.y = array.array('d', bytes(8 * capacity))
+            self.vx = array.array('d', bytes(8 * capacity))
+            self.vy = array.array('d', bytes(8 * capacity))
+            self.timer = array.array('i', bytes(4 * capacity))
+            self.color = array.array('B', bytes(capacity))
+
+    def __len__(self):
+        return self.count
+
+    def burst(self, x, y, colors, n, rng=random):
+        """Solta `n` partículas em (x, y) com cores sorteadas de `colors`."""
+        for _ in range(n):
+            if self.count >= self.capacity:
+                self.dropped += 1
+                continue
+            i = self.count
+            self.color[i] = PARTICLE_PALETTE.index(rng.choice(colors))
+            self.x[i] = x
+            self.y[i] = y
+            self.vx[i] = rng.uniform(-3, 3)
+            self.vy[i] = rng.uniform(-5, -1)
+            self.timer[i] = rng.randint(15, 30)
+            self.count += 1
+
+    FIELDS = ('x', 'y', 'vx', 'vy', 'timer', 'color')
+
+    def snapshot(self):
+        n = self.count
+        if np is not None:
+            fields = [getattr(self, name)[:n].copy() for name in self.FIELDS]
+        else:
+            fields = [getattr(self, name)[:n] for name in self.FIELDS]
+        return n, self.dropped, fields
+
+    def restore(self, state):
+        n, self.dropped, fields = state
+        self.count = n
+        for name, values in zip(self.FIELDS, fields):
+            getattr(self, name)[:n] = values
+
+    def update(self):
+        n = self.count
+        if not n:
+            return
+        if np is not None:
+            self.x[:n] += self.vx[:n]
+            self.y[:n] += self.vy[:n]
+            self.vy[:n] += 0.2
+            self.timer[:n] -= 1
+            alive = self.timer[:n] > 0
+            k = int(np.count_nonzero(alive))
+            if k < n:
+                for arr in (self.x, self.y, self.vx, self.vy, self.timer, self.color):
+                    arr[:k] = arr[:n][alive]
+            self.count = k
+            return
+        x, y, vx, vy, timer, color = self.x, self.y, self.vx, self.vy, self.timer, self.color
+        k = 0
+        for i in range(n):
+            t = timer[i] - 1
+            if t > 0:
+                x[k] = x[i] + vx[i]
+                y[k] = y[i] + vy[i]
+                vx[k] = vx[i]
+                vy[k] = vy[i] + 0.2
+                timer[k] = t
+                color[k] = color[i]
+                k += 1
+        self.count = k
+
+    def draw(self, surf, cam_x):
+        """Desenha tudo com um único `blits` de pontos pré-renderizados.
+
+        Devolve o retângulo que cobre todos os pontos (None sem partículas).
+        """
+        n = self.count
+        if not n:
+            return None
+        if not _particle_dots:
+            for i, col in enumerate(PARTICLE_PALETTE):
+                dot = pygame.Surface((7, 7))
+                dot.fill(COLORKEY)
+                pygame.draw.circle(dot, col, (3, 3), 3)
+                dot.set_colorkey(COLORKEY, pygame.RLEACCEL)
+                _particle_dots[i] = dot
+        if np is not None:
+            xs = (self.x[:n] - cam_x).astype(int).tolist()
+            ys = self.y[:n].astype(int).tolist()
+            cs = self.color[:n].tolist()
+        else:
+            xs = [int(v - cam_x) for v in self.x[:n]]
+            ys = [int(v) for v in self.y[:n]]
+            cs = self.color[:n]
+        dots = _particle_dots
+        surf.blits([(dots[c], (px - 3, py - 3)) for px, py, c in zip(xs, ys, cs)],
+                   doreturn=False)
+        x0, y0 = min(xs), min(ys)
+        return pygame.Rect(x0 - 3, y0 - 3, max(xs) - x0 + 7, max(ys) - y0 + 7)
+
+
+# Tudo que não é vazio nem tile da grade (inimigos, moedas, bandeira)
+_ENTITY_CHARS = re.compile(r'[^.GBQ]')
+
 
+def parse_columns(columns, c0=0):
+    """Interpreta fatias do mapa (uma string por fileira) a partir da coluna `c0`.
 
-def parse_level():
-    tiles = []
-    enemies = []
+    Devolve (spawns, coins, flag): posições (x, y) dos inimigos e das
+    moedas, em ordem de linha e depois coluna, e (x, y, altura) da
+    bandeira. Só dados, sem objetos, então o resultado pode ser guardado e
+    reaproveitado; os tiles vão para a grade com `TileGrid.fill`.
+    """
+    spawns = []
     coins = []
     flag = None
-    pipes = []  # Track pipe positions to draw them
-
-    for row_i, row in enumerate(LEVEL_MAP):
-        for col_i, ch in enumerate(row):
-            x = col_i * TILE
-            y = row_i * TILE
-            if ch == 'G':
-                tiles.append(Tile('ground', x, y))
-            elif ch == 'B':
-                tiles.append(Tile('brick', x, y))
-            elif ch == 'Q':
-                tiles.append(Tile('qblock', x, y))
-            elif ch == 'E':
-                enemies.append(Enemy(x, y))
+    rows = len(columns)
+    for row_i, row in enumerate(columns):
+        y = row_i * TILE
+        for m in _ENTITY_CHARS.finditer(row):
+            ch = m.group()
+            x = (c0 + m.start()) * TILE
+            if ch == 'E':
+                spawns.append((x, y))
             elif ch == 'C':
-                coins.append(Coin(x, y))
+                coins.append((x, y))
             elif ch == 'F':
-                flag = FlagPole(x, y, (LEVEL_H - 1 - row_i) * TILE)
+                flag = (x, y, (rows - 1 - row_i) * TILE)
+    return spawns, coins, flag
 
-    return tiles, enemies, coins, flag
+
+# ─────────────────────────────────────────────
+# Nível em streaming (chunks de colunas)
+# ─────────────────────────────────────────────
+STREAM_CHUNK_COLS = 16
+STREAM_AHEAD_COLS = 128    # carregado além da borda direita da tela
+STREAM_BEHIND_COLS = 128   # mantido antes da borda esquerda da tela
+PARSE_CACHE_SIZE = 32      # faixas já interpretadas guardadas por LevelSource
+
+
+class LevelSource:
+    """Mapa do nível lido por faixas de colunas (aqui, strings na memória).
+
+    `parse(c0, c1)` guarda as últimas faixas interpretadas, então
+    recomeçar a fase (morte, reset) ou vários World sobre a mesma fonte
+    não interpretam o mapa de novo.
+    """
+
+    def __init__(self, level_map):
+        self.level_map = level_map
+        self.rows = len(level_map)
+        self.cols = len(level_map[0])
+        self._parsed = OrderedDict()
+
+    def columns(self, c0, c1):
+        """Uma string por fileira, só com as colunas [c0, c1)."""
+        return [row[c0:c1] for row in self.level_map]
+
+    def parse(self, c0, c1):
+        """(columns, spawns, coins, flag) das colunas [c0, c1), em cache."""
+        cache = self._parsed
+        key = (c0, c1)
+        hit = cache.get(key)
+        if hit is not None:
+            cache.move_to_end(key)
+            return hit
+        columns = self.columns(c0, c1)
+        hit = cache[key] = (columns,) + parse_columns(columns, c0)
+        if len(cache) > PARSE_CACHE_SIZE:
+            cache.popitem(last=False)
+        return hit
+
+    def fill(self, grid, c0, columns, col, n):
+        """Grava na grade as colunas [col, col + n) de `columns` (de parse(c0, ...))."""
+        i0 = col - c0
+        grid.fill(col, [row[i0:i0 + n] for row in columns])
+
+    def close(self):
+        """Libera o que a fonte mantém aberto (aqui, nada)."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def digest(self):
+        """SHA-1 do mapa, para conferir que um replay roda no mesmo nível."""
+        h = hashlib.sha1()
+        for c0 in range(0, self.cols, 4096):
+            for row in self.columns(c0, min(c0 + 4096, self.cols)):
+                h.update(row.encode('ascii'))
+        return h.digest()
+
+
+class FileLevelSource(LevelSource):
+    """Mapa em arquivo texto (uma fileira por linha), lido sob demanda.
+
+    Só os bytes das colunas pedidas são lidos, então a memória não depende
+    da largura do nível.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._f = open(path, 'rb')
+        first = self._f.readline()
+        self.stride = len(first)
+        self.cols = len(first.rstrip(b'\r\n'))
+        size = os.fstat(self._f.fileno()).st_size
+        self.rows = -(-size // self.stride)
+        self._parsed = OrderedDict()
+
+    def columns(self, c0, c1):
+        c1 = min(c1, self.cols)
+        if hasattr(os, 'pread'):
+            # Sem mexer no offset do arquivo: processos filhos de um fork
+            # dividem o mesmo offset e um seek+read correria com os outros
+            fd = self._f.fileno()
+            return [os.pread(fd, c1 - c0, r * self.stride + c0).decode('ascii')
+                    for r in range(self.rows)]
+        f = self._f
+        out = []
+        for r in range(self.rows):
+            f.seek(r * self.stride + c0)
+            out.append(f.read(c1 - c0).decode('ascii'))
+        return out
+
+    def close(self):
+        self._f.close()
+
+
+class StreamingLevel:
+    """Nível instanciado em chunks de STREAM_CHUNK_COLS colunas.
+
+    `update(cam_x)` carrega os chunks que entram na janela em volta da
+    câmera e descarta os que ficaram para trás. Os tiles são gravados na
+    grade de bytes na primeira carga e ficam lá (blocos Q atingidos
+    inclusive); moedas e inimigos são descartados, e o estado deles vira
+    um delta compacto (moedas pegas, inimigos mortos, por célula)
+    reaplicado se o chunk voltar a ser carregado. Chunks vizinhos que
+    faltam são lidos juntos, em ordem de linha e coluna, como a varredura
+    do mapa inteiro faria.
+    """
+
+    def __init__(self, source, rng=random):
+        self.source = source
+        self.rng = rng
+        self.n_chunks = -(-source.cols // STREAM_CHUNK_COLS)
+        self.grid = TileGrid(source.cols, source.rows)
+        self.enemies = EnemySystem()
+        self.coins = []
+        self.flag = None
+        self.chunks = {}
+        self.filled = set()
+        # Passos simulados: a animação da moeda é frame próprio + relógio
+        self.coin_clock = 0
+        self.window = None
+        # Delta dos chunks descartados; chave = coluna * fileiras + fileira
+        self.taken_coins = set()
+        self.dead_enemies = set()
+        self.loads = 0
+        self.evictions = 0
+
+    def _cell(self, x, y):
+        return (x // TILE) * self.source.rows + y // TILE
+
+    def update(self, cam_x):
+        view = int(cam_x) // TILE
+        first = max(view - STREAM_BEHIND_COLS, 0) // STREAM_CHUNK_COLS
+        last = min((view + SCREEN_W // TILE + STREAM_AHEAD_COLS) // STREAM_CHUNK_COLS,
+                   self.n_chunks - 1)
+        if self.window == (first, last):
+            return
+        self.window = (first, last)
+        for idx in [i for i in self.chunks if not first <= i <= last]:
+            self._evict(idx)
+        idx = first
+        while idx <= last:
+            if idx in self.chunks:
+                idx += 1
+                continue
+            end = idx
+            while end < last and end + 1 not in self.chunks:
+                end += 1
+            self._load(idx, end)
+            idx = end + 1
+
+    def _load(self, first, last):
+        c0 = first * STREAM_CHUNK_COLS
+        c1 = min((last + 1) * STREAM_CHUNK_COLS, self.source.cols)
+        columns, spawns, coin_pos, flag = self.source.parse(c0, c1)
+        coins = [Coin(x, y, self.rng) for x, y in coin_pos]
+        if not self.filled.issuperset(range(first, last + 1)):
+            # Tiles ficam na grade depois da primeira carga (com as flags)
+            for idx in range(first, last + 1):
+                if idx not in self.filled:
+                    col = idx * STREAM_CHUNK_COLS
+                    self.source.fill(self.grid, c0, columns, col, min(STREAM_CHUNK_COLS, c1 - col))
+                    self.filled.add(idx)
+        for idx in range(first, last + 1):
+            self.chunks[idx] = []
+        for c in coins:
+            if self._cell(c.x, c.y) not in self.taken_coins:
+                c.frame -= self.coin_clock
+                self.coins.append(c)
+                self.chunks[c.x // TILE // STREAM_CHUNK_COLS].append(c)
+        for x, y in spawns:
+            cell = self._cell(x, y)
+            if cell not in self.dead_enemies:
+                self.enemies.add(x, y, cell)
+        if flag is not None:
+            self.flag = FlagPole(*flag)
+        self.loads += last - first + 1
+
+    def _fill_chunk(self, idx):
+        """Grava na grade os tiles do chunk `idx`, lidos da fonte."""
+        col = idx * STREAM_CHUNK_COLS
+        n = min(STREAM_CHUNK_COLS, self.source.cols - col)
+        columns = self.source.parse(col, col + n)[0]
+        self.source.fill(self.grid, col, columns, col, n)
+
+    def snapshot(self):
+        """Estado mutável: grade, inimigos, moedas por chunk, bandeira e o delta."""
+        pos = {id(c): i for i, c in enumerate(self.coins)}
+        flag = self.flag
+        return (self.grid.snapshot(), self.enemies.snapshot(),
+                [(c.x, c.y, c.frame, c.collected) for c in self.coins],
+                {idx: [pos[id(c)] for c in coins] for idx, coins in self.chunks.items()},
+                (flag.x, flag.y, flag.h, flag.touched) if flag is not None else None,
+                frozenset(self.filled), self.window, frozenset(self.taken_coins),
+                frozenset(self.dead_enemies), self.coin_clock, self.loads, self.evictions)
+
+    def restore(self, state):
+        (grid, enemies, coins, chunks, flag, filled, self.window, taken, dead,
+         self.coin_clock, self.loads, self.evictions) = state
+        # Faixas do snapshot que sumiram da grade (um reset no meio) voltam
+        # da fonte antes de a grade reaplicar as células mexidas
+        for idx in filled.difference(self.filled):
+            self._fill_chunk(idx)
+        self.grid.restore(grid)
+        # Faixas gravadas depois do snapshot voltam a ser não carregadas
+        for idx in self.filled.difference(filled):
+            col = idx * STREAM_CHUNK_COLS
+            self.grid.clear(col, min(STREAM_CHUNK_COLS, self.source.cols - col))
+        self.enemies.restore(enemies)
+        # Listas no lugar: o World guarda referências a elas
+        self.coins[:] = [Coin(x, y, frame=frame) for x, y, frame, _ in coins]
+        for c, (_, _, _, collected) in zip(self.coins, coins):
+            c.collected = collected
+        self.chunks = {idx: [self.coins[i] for i in members] for idx, members in chunks.items()}
+        self.flag = None
+        if flag is not None:
+            self.flag = FlagPole(*flag[:3])
+            self.flag.touched = flag[3]
+        self.filled = set(filled)
+        self.taken_coins = set(taken)
+        self.dead_enemies = set(dead)
+
+    def coins_in(self, x0, x1):
+        """Moedas dos chunks que cobrem [x0, x1), em ordem de linha e coluna."""
+        span = STREAM_CHUNK_COLS * TILE
+        found = []
+        for idx in range(max(x0, 0) // span, max(x1 - 1, 0) // span + 1):
+            found.extend(self.chunks.get(idx, ()))
+        found.sort(key=lambda c: (c.y, c.x))
+        return found
+
+    def _evict(self, idx):
+        coins = self.chunks.pop(idx)
+        if coins:
+            for c in coins:
+                if c.collected:
+                    self.taken_coins.add(self._cell(c.x, c.y))
+            gone = set(map(id, coins))
+            self.coins[:] = [c for c in self.coins if id(c) not in gone]
+        en = self.enemies
+        per_chunk = self.source.rows * STREAM_CHUNK_COLS
+        out = [i for i in range(en.count) if en.spawn[i] // per_chunk == idx]
+        for i in out:
+            if not en.alive[i]:
+                self.dead_enemies.add(int(en.spawn[i]))
+        en.discard(out)
+        if self.flag is not None and self.flag.x // TILE // STREAM_CHUNK_COLS == idx:
+            self.flag = None
+        self.evictions += 1
+
+
+# ─────────────────────────────────────────────
+# Níveis compilados (binário + mmap)
+# ─────────────────────────────────────────────
+# Formato (little-endian), tudo alinhado em 4 bytes:
+#   cabeçalho    LEVEL_HEADER: fileiras, colunas, contagens, bandeira, SHA-1
+#   tiles        colunas * fileiras códigos, na ordem de coluna da TileGrid
+#   inimigos     índice por coluna (colunas + 1 uint32) e pares (col, fileira)
+#   moedas       idem
+#   chão         pares (c0, c1) dos trechos sólidos da última fileira
+# O SHA-1 é o do mapa ASCII de origem, então replays gravados no mapa em
+# texto conferem no compilado.
+LEVEL_MAGIC = b'SZLV'
+LEVEL_VERSION = 1
+LEVEL_HEADER = struct.Struct('<4sHHIIIIiii20s')
+# Código do tile -> caractere do mapa (para reconstruir colunas em texto)
+LEVEL_CHARS = bytes(b'.GBQ'[i] if i < 4 else ord('.') for i in range(256))
+
+
+def _pad4(n):
+    return -n % 4
+
+
+def _u32(view):
+    """Vista uint32 de bytes little-endian (cópia só em máquina big-endian)."""
+    if sys.byteorder == 'little':
+        return view.cast('I')
+    table = array.array('I', bytes(view))
+    table.byteswap()
+    return table
+
+
+def _column_table(cells, cols):
+    """(índice por coluna, pares achatados) de células (col, fileira)."""
+    cells.sort()
+    index = array.array('I', [0]) * (cols + 1)
+    for col, _ in cells:
+        index[col + 1] += 1
+    for c in range(cols):
+        index[c + 1] += index[c]
+    return index, array.array('I', [v for cell in cells for v in cell])
+
+
+def compile_level(level_map, path):
+    """Compila um mapa (lista de strings ou LevelSource) para `path`.
+
+    Devolve o BinaryLevelSource do arquivo gravado.
+    """
+    source = level_map if isinstance(level_map, LevelSource) else LevelSource(level_map)
+    rows, cols = source.rows, source.cols
+    grid = TileGrid(cols, rows)
+    spawns, coins, flag = [], [], None
+    for c0 in range(0, cols, 4096):
+        columns = source.columns(c0, min(c0 + 4096, cols))
+        grid.fill(c0, columns)
+        s, c, f = parse_columns(columns, c0)
+        spawns += s
+        coins += c
+        # Como no parse do mapa inteiro, vale a última bandeira (linha, coluna)
+        if f is not None and (flag is None or (f[1], f[0]) > (flag[1], flag[0])):
+            flag = f
+    bottom = bytes(grid.types[rows - 1::rows])
+    spans = array.array('I', [v for m in re.finditer(rb'[^\x00]+', bottom) for v in m.span()])
+    tables = [_column_table([(x // TILE, y // TILE) for x, y in spawns], cols),
+              _column_table([(x // TILE, y // TILE) for x, y in coins], cols)]
+    fx, fy, fh = flag if flag is not None else (0, 0, -1)
+    parts = [LEVEL_HEADER.pack(LEVEL_MAGIC, LEVEL_VERSION, rows, cols, len(spawns),
+                               len(coins), len(spans) // 2, fx, fy, fh, source.digest()),
+             bytes(grid.types), bytes(_pad4(len(grid.types)))]
+    for table in [t for pair in tables for t in pair] + [spans]:
+        if sys.byteorder != 'little':
+            table.byteswap()
+        parts.append(table.tobytes())
+    tmp = '%s.%d.tmp' % (path, os.getpid())
+    with open(tmp, 'wb') as f:
+        f.write(b''.join(parts))
+    os.replace(tmp, path)
+    return BinaryLevelSource(path)
+
+
+class BinaryLevelSource(LevelSource):
+    """Nível compilado por compile_level, lido por mmap.
+
+    Abrir só lê o cabeçalho; tiles e tabelas são vistas (memoryview) sobre
+    o mapeamento, e o sistema traz as páginas sob demanda. Os tiles já
+    estão em códigos, na ordem de coluna da grade, então preencher um chunk
+    é copiar uma fatia contígua, sem strings nem objetos por tile.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = self._view = memoryview(self._map)
+        (magic, version, self.rows, self.cols, self.n_spawns, self.n_coins, n_spans,
+         fx, fy, fh, self._digest) = LEVEL_HEADER.unpack_from(view)
+        if magic != LEVEL_MAGIC or version != LEVEL_VERSION:
+            raise ValueError("%s: nível compilado de outra versão (esperada %d)"
+                             % (path, LEVEL_VERSION))
+        self.flag = (fx, fy, fh) if fh >= 0 else None
+        off = LEVEL_HEADER.size
+        size = self.cols * self.rows
+        self.tiles = view[off:off + size]
+        off += size + _pad4(size)
+        tables = []
+        for n in (self.cols + 1, 2 * self.n_spawns, self.cols + 1, 2 * self.n_coins, 2 * n_spans):
+            tables.append(_u32(view[off:off + 4 * n]))
+            off += 4 * n
+        self._spawn_index, self._spawns, self._coin_index, self._coins, self._spans = tables
+
+    @property
+    def ground_spans(self):
+        """Trechos [c0, c1) de chão sólido na última fileira (os buracos ficam entre eles)."""
+        spans = self._spans
+        return [(spans[i], spans[i + 1]) for i in range(0, len(spans), 2)]
+
+    def _cells(self, index, table, c0, c1):
+        cells = table[2 * index[c0]:2 * index[c1]]
+        found = [(cells[i] * TILE, cells[i + 1] * TILE) for i in range(0, len(cells), 2)]
+        # Ordem de linha e depois coluna, como parse_columns
+        found.sort(key=lambda p: (p[1], p[0]))
+        return found
+
+    def parse(self, c0, c1):
+        """(tiles, spawns, coins, flag) das colunas [c0, c1); `tiles` é uma vista."""
+        c1 = min(c1, self.cols)
+        rows = self.rows
+        flag = self.flag
+        if flag is not None and not c0 * TILE <= flag[0] < c1 * TILE:
+            flag = None
+        return (self.tiles[c0 * rows:c1 * rows],
+                self._cells(self._spawn_index, self._spawns, c0, c1),
+                self._cells(self._coin_index, self._coins, c0, c1), flag)
+
+    def fill(self, grid, c0, columns, col, n):
+        i = (col - c0) * self.rows
+        grid.fill_codes(col, columns[i:i + n * self.rows])
+
+    def columns(self, c0, c1):
+        """O mapa em texto das colunas [c0, c1), reconstruído (só para conferência)."""
+        c1 = min(c1, self.cols)
+        rows = self.rows
+        out = [bytearray(bytes(self.tiles[c0 * rows + r:c1 * rows:rows]).translate(LEVEL_CHARS))
+               for r in range(rows)]
+        _, spawns, coins, flag = self.parse(c0, c1)
+        marks = [(p, ord('E')) for p in spawns] + [(p, ord('C')) for p in coins]
+        if flag is not None:
+            marks.append((flag[:2], ord('F')))
+        for (x, y), ch in marks:
+            out[y // TILE][x // TILE - c0] = ch
+        return [row.decode('ascii') for row in out]
+
+    def digest(self):
+        return self._digest
+
+    def close(self):
+        """Solta as vistas e fecha o mapeamento.
+
+        Uma vista devolvida por parse() ainda viva impede o fechamento
+        (BufferError), como no próprio mmap.
+        """
+        if self._map.closed:
+            return
+        for view in (self._spawn_index, self._spawns, self._coin_index, self._coins,
+                     self._spans, self.tiles, self._view):
+            if isinstance(view, memoryview):
+                view.release()
+        self._map.close()
+
+
+def open_level(path):
+    """LevelSource de um arquivo: compilado (pelo cabeçalho) ou texto."""
+    with open(path, 'rb') as f:
+        magic = f.read(len(LEVEL_MAGIC))
+    return BinaryLevelSource(path) if magic == LEVEL_MAGIC else FileLevelSource(path)
 
 
 # ─────────────────────────────────────────────
@@ -574,21 +2024,605 @@ BG_HILLS = [
     (3600, LEVEL_H * TILE - TILE, 280, 95),
 ]
 
+TITLE_GROUND_Y = SCREEN_H - 80
+TITLE_CLOUDS = [(150, 100, 1.2), (500, 70, 0.9), (700, 120, 1.0)]
+TITLE_HILLS = [(50, TITLE_GROUND_Y, 200, 80), (500, TITLE_GROUND_Y, 300, 100)]
+TITLE_BUSHES = [(200, TITLE_GROUND_Y - 5, 1.2), (650, TITLE_GROUND_Y - 5, 0.8)]
+
+
+# ─────────────────────────────────────────────
+# Camadas de parallax em cache
+# ─────────────────────────────────────────────
+PARALLAX_SEG_W = 512
+
+
+def _cloud_bounds(x, y, size=1.0):
+    return pygame.Rect(x - int(40 * size) - 4, y - int(26 * size) - 4,
+                       int(80 * size) + 8, int(52 * size) + 8)
+
+
+def _bush_bounds(x, y, size=1.0):
+    return pygame.Rect(x - int(32 * size) - 4, y - int(20 * size) - 4,
+                       int(64 * size) + 8, int(40 * size) + 8)
+
+
+def _hill_bounds(x, y, w, h):
+    return pygame.Rect(x - 2, y - h - 2, w + 4, h + 4)
+
+
+class ParallaxLayer:
+    """Decorações de fundo pré-renderizadas em faixas de largura fixa.
+
+    Os itens ficam em coordenadas da camada; na tela, x = x_camada -
+    int(cam_x * factor). Só as faixas visíveis são desenhadas, e faixas sem
+    nenhuma decoração nem chegam a existir.
+    """
+
+    def __init__(self, factor, draw_fn, bounds_fn, items):
+        self.factor = factor
+        self.draw_fn = draw_fn
+        self.bounds_fn = bounds_fn
+        self.items = items
+        self.top = 0
+        self._segments = None
+
+    def _build(self):
+        bounds = [self.bounds_fn(*item) for item in self.items]
+        self.top = min(b.top for b in bounds)
+        height = max(b.bottom for b in bounds) - self.top
+        members = {}
+        for item, b in zip(self.items, bounds):
+            for idx in range(b.left // PARALLAX_SEG_W, (b.right - 1) // PARALLAX_SEG_W + 1):
+                members.setdefault(idx, []).append(item)
+        segments = {}
+        for idx, items in members.items():
+            x0 = idx * PARALLAX_SEG_W
+            seg = pygame.Surface((PARALLAX_SEG_W, height))
+            seg.fill(COLORKEY)
+            for x, y, *rest in items:
+                self.draw_fn(seg, x - x0, y - self.top, *rest)
+            seg.set_colorkey(COLORKEY, pygame.RLEACCEL)
+            segments[idx] = seg
+        self._segments = segments
+
+    def draw(self, surf, cam_x):
+        if self._segments is None:
+            self._build()
+        off = int(cam_x * self.factor)
+        for idx in range(off // PARALLAX_SEG_W, (off + SCREEN_W) // PARALLAX_SEG_W + 1):
+            seg = self._segments.get(idx)
+            if seg is not None:
+                surf.blit(seg, (idx * PARALLAX_SEG_W - off, self.top))
+
+
+BG_LAYERS = [
+    ParallaxLayer(0.3, draw_hill, _hill_bounds, BG_HILLS),
+    ParallaxLayer(0.2, draw_cloud, _cloud_bounds, BG_CLOUDS),
+    ParallaxLayer(1.0, draw_bush, _bush_bounds, BG_BUSHES),
+]
+TITLE_LAYERS = [
+    ParallaxLayer(0, draw_cloud, _cloud_bounds, TITLE_CLOUDS),
+    ParallaxLayer(0, draw_hill, _hill_bounds, TITLE_HILLS),
+    ParallaxLayer(0, draw_bush, _bush_bounds, TITLE_BUSHES),
+]
+
 
 # ─────────────────────────────────────────────
 # Sprites pré-renderizados
 # ─────────────────────────────────────────────
-brick_surf = draw_brick_sprite(TILE, TILE)
-qblock_surf = draw_qblock_sprite(TILE, TILE, hit=False)
-qblock_hit_surf = draw_qblock_sprite(TILE, TILE, hit=True)
-flag_surf = None  # Will be created per flag
+# Renderizados no primeiro uso (ou pelo aquecimento), não no import.
+_tile_surfs = {}
+TILE_ART = {
+    T_GROUND: lambda: draw_ground_sprite(TILE, TILE),
+    T_BRICK: lambda: draw_brick_sprite(TILE, TILE),
+    T_QBLOCK: lambda: draw_qblock_sprite(TILE, TILE, hit=False),
+    T_QBLOCK | TILE_HIT: lambda: draw_qblock_sprite(TILE, TILE, hit=True),
+}
+
+
+def _load_tile_surfs():
+    for code, draw in TILE_ART.items():
+        _tile_surfs[code] = draw()
+
+
+def tile_sprite(code):
+    """Superfície pré-renderizada de um tile, pelo byte da grade (tipo e estado)."""
+    if not _tile_surfs:
+        _load_tile_surfs()
+    if code & TILE_TYPE_MASK == T_QBLOCK:
+        return _tile_surfs[code & (TILE_TYPE_MASK | TILE_HIT)]
+    return _tile_surfs[code & TILE_TYPE_MASK]
+
+
+def flag_sprite(pole_h):
+    """Versão em cache de draw_flag_sprite."""
+    return sprite_cache.get(('flag', pole_h), lambda: draw_flag_sprite(pole_h))
+
+
+# ─────────────────────────────────────────────
+# Atlas de sprites (bake offline)
+# ─────────────────────────────────────────────
+# `--bake-atlas` desenha uma vez todos os sprites e quadros de animação numa
+# imagem só (ATLAS_PATH + '.bmp') com um índice binário (ATLAS_PATH + '.idx').
+# O índice guarda só os retângulos, na ordem de atlas_entries(), e um digest
+# das chaves e do código de desenho: mudar a arte (ou ATLAS_VERSION) deixa o
+# atlas velho, e o jogo volta a desenhar tudo sob demanda.
+#
+# A imagem é BMP de 32 bits sem compressão: carregar é uma leitura e uma
+# cópia, sem inflate (PNG levava 4x mais que desenhar tudo de novo). As
+# camadas de parallax ficam de fora: desenhar as faixas custa menos que
+# ler os pixels delas.
+ATLAS_VERSION = 1
+ATLAS_MAGIC = b'SZAT'
+ATLAS_HEADER = struct.Struct('<4sH20sI')
+ATLAS_RECT = struct.Struct('<HHHH')
+ATLAS_W = 2048
+ATLAS_PAD = 1
+ATLAS_PATH = os.environ.get('SUPER_ZEBRA_ATLAS', os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'super_zebra_atlas'))
+# Funções cujo código (e paleta) entra no digest do atlas; as da tira da
+# moeda levam junto COIN_SPIN_STEPS
+ATLAS_ART = (_draw_zebra_pose, _draw_turtle_pose, draw_coin_sprite, draw_qblock_sprite,
+             draw_brick_sprite, draw_ground_sprite, draw_flag_sprite,
+             _draw_coin_strip, _split_coin_strip)
+# (w, h, frame, virada à direita, pulando): jogador, título, vitória, fim de jogo
+ATLAS_ZEBRAS = ((44, 44, None, True, False), (44, 44, None, False, False),
+                (44, 44, None, True, True), (44, 44, None, False, True),
+                (80, 80, None, True, False), (80, 80, None, True, True),
+                (60, 60, 0, True, False))
+ATLAS_COINS = ((TILE, TILE), (22, 22))
+
+
+def _pose_frames():
+    """Um frame para cada combinação (pernas, cauda) que acontece no jogo.
+
+    As duas fases andam juntas (0.3 e 0.2 por frame), então o conjunto é
+    pequeno e fica completo bem antes de POSE_STEPS * 64 frames.
+    """
+    seen = {}
+    for frame in range(POSE_STEPS * 64):
+        seen.setdefault((_pose_step(frame * 0.3) if frame else None,
+                         _pose_step(frame * 0.2) if frame else None), frame)
+    return sorted(seen.values())
+
+
+def atlas_entries():
+    """(chave, desenho) de tudo o que vai para o atlas, em ordem fixa."""
+    entries = [(('tile', code), draw) for code, draw in TILE_ART.items()]
+    frames = _pose_frames()
+    keys = [_zebra_key(w, h, f, facing_right, jumping)
+            for w, h, frame, facing_right, jumping in ATLAS_ZEBRAS
+            for f in (frames if frame is None else (frame,))]
+    keys += [_turtle_key(TILE, TILE, f) for f in frames]
+    keys.append(_turtle_key(TILE, TILE, alive=False))
+    for key in dict.fromkeys(keys):  # sem repetidas, na mesma ordem
+        draw = _draw_zebra_key if key[0] == 'zebra' else _draw_turtle_key
+        entries.append((key, lambda key=key, draw=draw: draw(key)))
+    for w, h in ATLAS_COINS:
+        entries.append((('coin', w, h), lambda w=w, h=h: _draw_coin_strip(w, h)))
+    flag = parse_columns(LEVEL_MAP)[2]
+    if flag:
+        entries.append((('flag', flag[2]), lambda h=flag[2]: draw_flag_sprite(h)))
+    return entries
+
+
+def _code_digest(h, code):
+    h.update(code.co_code)
+    for const in code.co_consts:
+        if isinstance(const, type(code)):
+            _code_digest(h, const)
+        else:
+            h.update(repr(const).encode())
+    for name in code.co_names:
+        value = globals().get(name)
+        if isinstance(value, (int, float, tuple)):
+            h.update(repr((name, value)).encode())
+
+
+def atlas_digest(entries):
+    h = hashlib.sha1(repr((ATLAS_VERSION, pygame.version.ver,
+                           [key for key, _ in entries])).encode())
+    for fn in ATLAS_ART:
+        _code_digest(h, fn.__code__)
+    return h.digest()
+
+
+def _pack_atlas(sizes):
+    """Empacota em prateleiras, dos mais altos para os mais baixos."""
+    order = sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0]))
+    rects = [None] * len(sizes)
+    x = y = shelf_h = 0
+    for i in order:
+        w, h = sizes[i]
+        if x + w > ATLAS_W:
+            x, y, shelf_h = 0, y + shelf_h + ATLAS_PAD, 0
+        rects[i] = pygame.Rect(x, y, w, h)
+        x += w + ATLAS_PAD
+        shelf_h = max(shelf_h, h)
+    return rects
+
+
+def bake_atlas(path=ATLAS_PATH):
+    """Desenha tudo em `path`.bmp e grava o índice. Devolve (sprites, tamanho)."""
+    pygame.font.init()
+    entries = atlas_entries()
+    surfs = [draw() for _, draw in entries]
+    rects = _pack_atlas([s.get_size() for s in surfs])
+    atlas = pygame.Surface((ATLAS_W, max(r.bottom for r in rects)), pygame.SRCALPHA)
+    atlas.fill((0, 0, 0, 0))
+    for surf, rect in zip(surfs, rects):
+        # Soma sobre o fundo zerado: copia RGBA exatamente, sem mistura
+        atlas.blit(surf, rect, special_flags=pygame.BLEND_RGBA_ADD)
+    index = [ATLAS_HEADER.pack(ATLAS_MAGIC, ATLAS_VERSION, atlas_digest(entries), len(entries))]
+    index += [ATLAS_RECT.pack(*r) for r in rects]
+    pygame.image.save(atlas, path + '.bmp')
+    with open(path + '.idx', 'wb') as f:
+        f.write(b''.join(index))
+    return len(entries), atlas.get_size()
+
+
+def _install_sprite(key, surf):
+    """Instala um sprite do atlas (para 'coin', a lista de quadros da tira)."""
+    kind = key[0]
+    if kind == 'tile':
+        _tile_surfs[key[1]] = surf
+    elif kind == 'coin':
+        _coin_strips[key[1:]] = surf
+    else:
+        sprite_cache.pin(key, surf)
+
+
+def load_atlas(path=ATLAS_PATH):
+    """Carrega o atlas assado, se existir e bater com a arte atual.
+
+    Uma leitura da imagem, uma conversão para o formato da tela e
+    subsuperfícies para cada sprite. Devolve False (sem mudar nada) se o
+    atlas faltar, estiver velho ou corrompido; aí os sprites são desenhados
+    sob demanda. Nada é instalado antes de o atlas inteiro ser validado.
+    """
+    try:
+        with open(path + '.idx', 'rb') as f:
+            index = f.read()
+        magic, version, digest, count = ATLAS_HEADER.unpack_from(index)
+    except (OSError, struct.error):
+        return False
+    entries = atlas_entries()
+    if (magic != ATLAS_MAGIC or version != ATLAS_VERSION or count != len(entries)
+            or len(index) != ATLAS_HEADER.size + count * ATLAS_RECT.size
+            or digest != atlas_digest(entries)):
+        return False
+    staged = []
+    try:
+        atlas = pygame.image.load(path + '.bmp')
+        if pygame.display.get_surface() is not None:
+            atlas = atlas.convert_alpha()
+        bounds = atlas.get_rect()
+        rects = ATLAS_RECT.iter_unpack(memoryview(index)[ATLAS_HEADER.size:])
+        for (key, _), rect in zip(entries, rects):
+            rect = pygame.Rect(rect)
+            if not bounds.contains(rect):
+                return False
+            surf = atlas.subsurface(rect)
+            if key[0] == 'coin':
+                w, h = key[1:]
+                if rect.size != (w * COIN_SPIN_STEPS, h):
+                    return False
+                surf = _split_coin_strip(surf, w, h)
+            staged.append((key, surf))
+    except Exception:
+        return False
+    for key, surf in staged:
+        _install_sprite(key, surf)
+    return True
+
+
+# ─────────────────────────────────────────────
+# Inicialização adiada e orçamento de startup
+# ─────────────────────────────────────────────
+STARTUP_BUDGET_MS = 250   # Meta de tempo até o primeiro frame
+WARMUP_SLICE_MS = 4       # Tempo de aquecimento permitido por frame
+
+
+class StartupTimer:
+    """Cronometra as fases da inicialização, a partir do início do import."""
+
+    def __init__(self, t0=_START):
+        self.t0 = t0
+        self.last = t0
+        self.phases = []
+
+    def mark(self, name):
+        """Fecha a fase `name` (do último mark até agora)."""
+        now = time.perf_counter()
+        self.phases.append((name, (now - self.last) * 1000))
+        self.last = now
+
+    def total_ms(self):
+        return (self.last - self.t0) * 1000
+
+
+class Warmup:
+    """Fila de tarefas de aquecimento, executadas em fatias entre frames.
+
+    Cada chamada a `run` executa tarefas até estourar a fatia de tempo (no
+    mínimo uma), para que o primeiro frame não espere por assets que só
+    serão usados depois.
+    """
+
+    def __init__(self):
+        self.tasks = deque()
+        self.done = []
+
+    def add(self, name, fn):
+        self.tasks.append((name, fn))
+
+    @property
+    def pending(self):
+        return len(self.tasks)
+
+    def run(self, budget_ms=WARMUP_SLICE_MS):
+        deadline = time.perf_counter() + budget_ms / 1000
+        while self.tasks:
+            name, fn = self.tasks.popleft()
+            t = time.perf_counter()
+            fn()
+            now = time.perf_counter()
+            self.done.append((name, (now - t) * 1000))
+            if now >= deadline:
+                break
+
+    def finish(self):
+        self.run(float('inf'))
+
+
+def default_warmup():
+    """Tarefas que aquecem o que a tela de título ainda não usou."""
+    warm = Warmup()
+    # Primeiro o atlas: com ele, as tarefas de sprites abaixo não desenham nada
+    warm.add('atlas', load_atlas)
+    warm.add('audio', init_audio)
+    for name in SOUND_SPECS:
+        warm.add('sound:' + name, lambda name=name: load_sound(name))
+    warm.add('tile_sprites', lambda: tile_sprite(T_GROUND))
+    warm.add('font_hud', lambda: fonts.font('Arial', 22, bold=True))
+    warm.add('coin_strip', lambda: (coin_sprite(TILE, TILE), coin_sprite(22, 22)))
+    for i, layer in enumerate(BG_LAYERS):
+        warm.add('parallax:%d' % i, lambda layer=layer: layer.draw(pygame.Surface((1, 1)), 0))
+    warm.add('poses', lambda: (zebra_sprite(44, 44), turtle_sprite(TILE, TILE)))
+    return warm
+
+
+# ─────────────────────────────────────────────
+# Profiler por fase (overlay F3 e trace do Chrome)
+# ─────────────────────────────────────────────
+PROFILE_WINDOW = 120          # frames na média móvel e no gráfico
+PROFILE_REFRESH = 15          # o texto do overlay é refeito a cada N frames
+TRACE_MAX_EVENTS = 500000     # limite de memória do trace
+
+
+class Profiler:
+    """Cronômetro de fases dentro do frame.
+
+    Cada `mark(name)` fecha a fase `name`, do mark anterior até agora, como
+    o StartupTimer. Desligado, `mark` só testa uma flag e retorna.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.overlay = False
+        self.tracing = False
+        self.t0 = time.perf_counter()
+        self.frame_start = self.last = self.t0
+        self.history = {}
+        self.frames = deque(maxlen=PROFILE_WINDOW)
+        self.trace = []
+        self.frame_count = 0
+        self._panel = None
+        # Loop de passo fixo: passos simulados sem desenhar (recuperação) e
+        # passos descartados além de MAX_CATCHUP_STEPS. Contados sempre.
+        self.sim_steps = 0
+        self.skipped = 0
+        self.dropped = 0
+
+    def toggle_overlay(self):
+        self.overlay = not self.overlay
+        self.enabled = self.overlay or self.tracing
+        self._panel = None
+
+    def start_trace(self):
+        self.tracing = self.enabled = True
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        self.frame_start = self.last = time.perf_counter()
+
+    def mark(self, name):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        hist = self.history.get(name)
+        if hist is None:
+            hist = self.history[name] = deque(maxlen=PROFILE_WINDOW)
+        hist.append((now - self.last) * 1000)
+        if self.tracing and len(self.trace) < TRACE_MAX_EVENTS:
+            self.trace.append((name, self.last, now))
+        self.last = now
+
+    def end_frame(self):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.frames.append((now - self.frame_start) * 1000)
+        if self.tracing and len(self.trace) < TRACE_MAX_EVENTS:
+            self.trace.append(('frame', self.frame_start, now))
+        self.frame_count += 1
+
+    def count_steps(self, steps, dropped):
+        """Passos de simulação rodados (e descartados) neste frame."""
+        self.sim_steps += steps
+        if steps > 1:
+            self.skipped += steps - 1
+        self.dropped += dropped
+
+    def averages(self):
+        """Média móvel (ms) de cada fase, na ordem em que apareceram."""
+        return [(name, sum(h) / len(h)) for name, h in self.history.items() if h]
+
+    def export_trace(self, path):
+        """Grava o trace no formato trace-event do Chrome (chrome://tracing)."""
+        events = []
+        for name, start, end in self.trace:
+            events.append({
+                'name': name, 'ph': 'X', 'pid': 1, 'tid': 1 if name == 'frame' else 2,
+                'ts': round((start - self.t0) * 1e6, 1),
+                'dur': round((end - start) * 1e6, 1),
+            })
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+        return len(events)
+
+    def draw(self, surf):
+        """Overlay com as médias por fase e o gráfico dos tempos de frame."""
+        if not self.overlay:
+            return
+        if self._panel is None or self.frame_count % PROFILE_REFRESH == 0:
+            self._panel = self._build_panel()
+        surf.blit(self._panel, (8, 44))
+        self._draw_graph(surf, 8, 44 + self._panel.get_height() + 4)
+
+    def _build_panel(self):
+        rows = self.averages()
+        frame_ms = sum(self.frames) / len(self.frames) if self.frames else 0.0
+        rows = [('frame', frame_ms)] + rows
+        panel = pygame.Surface((150, 16 * len(rows) + 24))
+        panel.fill(BLACK)
+        panel.set_alpha(190)
+        # Texto efêmero: fora do cache de textos, para não expulsar o HUD
+        def text(s, color=WHITE):
+            return fonts.render_uncached(s, 'Courier New', 14, color)
+        for i, (name, ms) in enumerate(rows):
+            panel.blit(text(name), (6, 4 + 16 * i))
+            val = text("%.2f ms" % ms, COIN_COL if name == 'frame' else WHITE)
+            panel.blit(val, (144 - val.get_width(), 4 + 16 * i))
+        lost = "pulo %d  perda %d" % (self.skipped, self.dropped)
+        panel.blit(text(lost, RED if self.dropped else WHITE), (6, 4 + 16 * len(rows)))
+        return panel
+
+    def _draw_graph(self, surf, x, y, h=60):
+        w = PROFILE_WINDOW
+        surf.fill(BLACK, (x, y, w, h))
+        scale = h / (2000.0 / FPS)  # topo do gráfico = dois frames
+        budget = y + h - int(1000.0 / FPS * scale)
+        pygame.draw.line(surf, FLAG_GREEN, (x, budget), (x + w - 1, budget))
+        for i, ms in enumerate(self.frames):
+            bar = min(int(ms * scale), h)
+            color = RED if ms > 1000.0 / FPS else COIN_COL
+            pygame.draw.line(surf, color, (x + i, y + h - 1), (x + i, y + h - bar))
+
+
+profiler = Profiler()
+
+
+# ─────────────────────────────────────────────
+# Camada de terreno em chunks
+# ─────────────────────────────────────────────
+TILE_CHUNK_COLS = 8
+TILE_CHUNK_CACHE = 8
+
+
+class TileLayer:
+    """Terreno estático pré-renderizado em chunks de largura fixa.
+
+    Cada chunk visível é um único blit. Tiles quicando são desenhados à
+    parte, com o deslocamento do bounce; quando um tile começa ou termina
+    de quicar (ou um bloco Q é atingido), só o chunk dele é refeito.
+    """
+
+    def __init__(self, grid):
+        self.grid = grid
+        self.chunk_w = TILE_CHUNK_COLS * TILE
+        self.n_chunks = (grid.cols + TILE_CHUNK_COLS - 1) // TILE_CHUNK_COLS
+        self.rebuilds = 0
+        self.version = grid.version
+        self._chunks = OrderedDict()
+        self._bouncing = set()
+
+    def invalidate(self, tile):
+        self._chunks.pop(tile.col // TILE_CHUNK_COLS, None)
+
+    def _build(self, idx):
+        x0 = idx * self.chunk_w
+        h = self.grid.rows * TILE
+        # Tiles são opacos: colorkey + RLE deixa o blit dos vazios quase grátis
+        surf = pygame.Surface((self.chunk_w, h))
+        surf.fill(COLORKEY)
+        bouncing = {(t.col, t.row) for t in self._bouncing}
+        grid = self.grid
+        for col, row in grid.query(pygame.Rect(x0, 0, self.chunk_w, h)):
+            if (col, row) not in bouncing:
+                surf.blit(tile_sprite(grid.code(col, row)), (col * TILE - x0, row * TILE))
+        surf.set_colorkey(COLORKEY, pygame.RLEACCEL)
+        self.rebuilds += 1
+        return surf
+
+    def _chunk(self, idx):
+        chunk = self._chunks.get(idx)
+        if chunk is None:
+            chunk = self._chunks[idx] = self._build(idx)
+            if len(self._chunks) > TILE_CHUNK_CACHE:
+                self._chunks.popitem(last=False)
+        else:
+            self._chunks.move_to_end(idx)
+        return chunk
+
+    def draw(self, surf, cx):
+        """Desenha a faixa visível; devolve as áreas dos tiles que quicam."""
+        if self.version != self.grid.version:
+            # Chunks do nível entraram ou saíram (streaming)
+            self._chunks.clear()
+            self.version = self.grid.version
+        bouncing = [t for t in self.grid.active if t.bounce_timer > 0]
+        bouncing_set = set(bouncing)
+        dirty = []
+        for t in bouncing_set ^ self._bouncing:
+            self.invalidate(t)
+        for t in bouncing_set | self._bouncing:
+            dirty.append(pygame.Rect(t.col * TILE - cx, t.row * TILE - 6, TILE, TILE + 12))
+        self._bouncing = bouncing_set
+
+        first = max(cx // self.chunk_w, 0)
+        last = min((cx + SCREEN_W) // self.chunk_w, self.n_chunks - 1)
+        for idx in range(first, last + 1):
+            surf.blit(self._chunk(idx), (idx * self.chunk_w - cx, 0))
+
+        for t in bouncing:
+            bounce_off = -int(math.sin(t.bounce_timer * 0.4) * 6)
+            surf.blit(tile_sprite(t.code), (t.col * TILE - cx, t.row * TILE + bounce_off))
+        return dirty
+
+
+# ─────────────────────────────────────────────
+# Controles
+# ─────────────────────────────────────────────
+class Inputs(namedtuple('Inputs', 'left right jump')):
+    """Estado dos controles num frame da simulação."""
+    __slots__ = ()
+
+    @classmethod
+    def from_keys(cls, keys):
+        return cls(bool(keys[pygame.K_LEFT]), bool(keys[pygame.K_RIGHT]),
+                   bool(keys[pygame.K_SPACE] or keys[pygame.K_UP]))
+
+
+NO_INPUT = Inputs(False, False, False)
 
 
 # ─────────────────────────────────────────────
 # Classe do Jogador
 # ─────────────────────────────────────────────
 class Player:
-    def __init__(self, x, y):
+    def __init__(self, x, y, events=None):
         self.rect = pygame.Rect(x, y, 44, 44)
         self.vx = 0
         self.vy = 0
@@ -605,6 +2639,18 @@ class Player:
         self.invincible = 0  # Invincibility frames
         self.won = False
         self.win_timer = 0
+        self.death_cause = None
+        # Eventos sonoros ('jump', 'die', ...) para quem estiver tocando áudio
+        self.events = events if events is not None else []
+
+    def snapshot(self):
+        state = {k: v for k, v in vars(self).items() if k != 'events'}
+        state['rect'] = self.rect.copy()
+        return state
+
+    def restore(self, state):
+        self.__dict__.update(state)
+        self.rect = state['rect'].copy()
 
     GRAVITY = 1.0
     MAX_FALL = 10
@@ -613,7 +2659,7 @@ class Player:
     ACCEL = 0.5
     FRICTION = 0.3
 
-    def update(self, keys, tiles):
+    def update(self, inputs, grid):
         if not self.alive:
             self.death_timer += 1
             if self.death_timer < 20:
@@ -628,10 +2674,10 @@ class Player:
             return
 
         # Horizontal
-        if keys[pygame.K_RIGHT]:
+        if inputs.right:
             self.vx = min(self.vx + self.ACCEL, self.SPEED)
             self.facing_right = True
-        elif keys[pygame.K_LEFT]:
+        elif inputs.left:
             self.vx = max(self.vx - self.ACCEL, -self.SPEED)
             self.facing_right = False
         else:
@@ -641,14 +2687,13 @@ class Player:
                 self.vx = min(0, self.vx + self.FRICTION)
 
         # Jump
-        if (keys[pygame.K_SPACE] or keys[pygame.K_UP]) and self.on_ground:
+        if inputs.jump and self.on_ground:
             self.vy = self.JUMP_FORCE
             self.on_ground = False
-            if snd_jump:
-                snd_jump.play()
+            self.events.append('jump')
 
         # Variable jump height
-        if not (keys[pygame.K_SPACE] or keys[pygame.K_UP]) and self.vy < -3:
+        if not inputs.jump and self.vy < -3:
             self.vy = max(self.vy, -3)
 
         # Gravity
@@ -656,18 +2701,18 @@ class Player:
 
         # Move X
         self.rect.x += int(self.vx)
-        self._collide_x(tiles)
+        self._collide_x(grid)
 
         # Move Y
         self.rect.y += int(self.vy)
-        self._collide_y(tiles)
+        self._collide_y(grid)
 
         # World bounds
         if self.rect.left < 0:
             self.rect.left = 0
             self.vx = 0
-        if self.rect.top > WORLD_H + 100:
-            self.die()
+        if self.rect.top > grid.rows * TILE + 100:
+            self.die('fall')
 
         # Animation
         if abs(self.vx) > 0.5 and self.on_ground:
@@ -679,198 +2724,236 @@ class Player:
         if self.invincible > 0:
             self.invincible -= 1
 
-    def _collide_x(self, tiles):
-        for t in tiles:
-            if self.rect.colliderect(t.rect):
+    # A consulta cobre uma célula a mais no eixo do movimento, porque a
+    # correção de posição pode empurrar o retângulo para a célula vizinha.
+    def _collide_x(self, grid):
+        for col, row in grid.query(self.rect.inflate(2 * TILE, 0)):
+            if self.rect.colliderect((col * TILE, row * TILE, TILE, TILE)):
                 if self.vx > 0:
-                    self.rect.right = t.rect.left
+                    self.rect.right = col * TILE
                     self.vx = 0
                 elif self.vx < 0:
-                    self.rect.left = t.rect.right
+                    self.rect.left = (col + 1) * TILE
                     self.vx = 0
 
-    def _collide_y(self, tiles):
+    def _collide_y(self, grid):
         self.on_ground = False
-        for t in tiles:
-            if self.rect.colliderect(t.rect):
+        for col, row in grid.query(self.rect.inflate(0, 2 * TILE)):
+            if self.rect.colliderect((col * TILE, row * TILE, TILE, TILE)):
                 if self.vy > 0:
-                    self.rect.bottom = t.rect.top
+                    self.rect.bottom = row * TILE
                     self.vy = 0
                     self.on_ground = True
                 elif self.vy < 0:
-                    self.rect.top = t.rect.bottom
+                    self.rect.top = (row + 1) * TILE
                     self.vy = 0
                     # Hit block from below
-                    if t.type == 'qblock' and not t.hit:
+                    code = grid.code(col, row)
+                    kind = code & TILE_TYPE_MASK
+                    if kind == T_QBLOCK and not code & TILE_HIT:
+                        t = grid.activate(col, row)
                         t.hit = True
                         t.bounce_timer = 8
                         return t  # Signal that we hit a Q block
-                    elif t.type == 'brick':
-                        t.bounce_timer = 5
+                    elif kind == T_BRICK:
+                        grid.activate(col, row).bounce_timer = 5
         return None
 
-    def die(self):
+    def die(self, cause='enemy'):
         if self.invincible > 0:
             return
+        self.death_cause = cause
         self.alive = False
         self.vy = 0
         self.death_timer = 0
         self.death_y = self.rect.y
-        if snd_die:
-            snd_die.play()
+        self.events.append('die')
 
-    def draw(self, surf, cam_x):
+    def draw(self, surf, cam_x, at=None):
+        """`at` desenha em outra posição (x, y) do mundo (interpolação).
+
+        Devolve a área desenhada (None se a zebra não aparece no frame).
+        """
         if not self.alive and self.death_timer > 60:
-            return
+            return None
         if self.invincible > 0 and self.invincible % 4 < 2:
-            return  # Blinking
-        sx = self.rect.x - cam_x
-        sy = self.rect.y
+            return None  # Blinking
+        x, y = at if at is not None else self.rect.topleft
+        sx = x - cam_x
+        sy = y
         jumping = not self.on_ground
-        zebra = draw_zebra_sprite(self.rect.w, self.rect.h, self.frame,
-                                   self.facing_right, jumping)
-        surf.blit(zebra, (sx, sy))
+        zebra = zebra_sprite(self.rect.w, self.rect.h, self.frame,
+                             self.facing_right, jumping)
+        return surf.blit(zebra, (sx, sy))
 
 
 # ─────────────────────────────────────────────
-# Game Class
+# Simulação (headless)
 # ─────────────────────────────────────────────
-class Game:
-    STATE_TITLE = 0
-    STATE_PLAY = 1
-    STATE_GAMEOVER = 2
-    STATE_WIN = 3
-
-    def __init__(self):
-        self.state = self.STATE_TITLE
-        self.font_big = pygame.font.SysFont('Arial', 52, bold=True)
-        self.font_med = pygame.font.SysFont('Arial', 28, bold=True)
-        self.font_sm = pygame.font.SysFont('Arial', 20)
-        self.font_hud = pygame.font.SysFont('Arial', 22, bold=True)
-        self.title_frame = 0
+# Estado mutável de um World (ver World.snapshot)
+WorldState = namedtuple('WorldState', 'level player cam_x spawned particles time_left '
+                                      'time_tick global_frame status deaths rng')
+
+
+class World:
+    """Simulação do jogo sem janela, sem mixer e sem relógio.
+
+    Monte com um nível, chame `step(inputs)` uma vez por frame (passo fixo
+    de 1/FPS s) e leia o estado de volta. O Game interativo roda exatamente
+    este código, então a física é a mesma nos dois casos. Sons viram nomes
+    em `events`, reiniciados a cada passo.
+    """
+    STATUS_PLAYING = 'playing'
+    STATUS_WON = 'won'
+    STATUS_GAMEOVER = 'gameover'
+
+    def __init__(self, level_map=LEVEL_MAP, seed=None, active_margin=ACTIVE_MARGIN):
+        """`level_map` é uma lista de strings ou um LevelSource.
+
+        Inimigos a mais de `active_margin` px da tela dormem (None: todos
+        sempre ativos).
+        """
+        self.level_map = level_map
+        self.active_margin = active_margin
+        if isinstance(level_map, LevelSource):
+            self.source = level_map
+        else:
+            self.source = LevelSource(level_map)
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.width = self.source.cols * TILE
+        self.events = []
+        # Causa de cada vida perdida ('enemy', 'fall', 'time')
+        self.deaths = []
+        self.status = self.STATUS_PLAYING
         self.init_level()
 
+    def reset(self, seed=None):
+        """Recomeça a partida do zero, com `seed` (ou a mesma semente).
+
+        Igual a um World novo, mas restaurando o molde do início do nível
+        em vez de montar o nível de novo.
+        """
+        if seed is not None:
+            self.seed = seed
+        self.rng = random.Random(self.seed)
+        del self.events[:]
+        del self.deaths[:]
+        self.status = self.STATUS_PLAYING
+        self._restart_level()
+
     def init_level(self):
-        self.tiles, self.enemies, self.coins, self.flag = parse_level()
-        self.player = Player(80, (LEVEL_H - 3) * TILE)
+        self.level = StreamingLevel(self.source, self.rng)
+        self.level.update(0)
+        self.grid = self.level.grid
+        self.enemies = self.level.enemies
+        self.coins = self.level.coins
+        self.player = Player(80, (self.source.rows - 3) * TILE, self.events)
         self.cam_x = 0
         self.spawned_coins = []
-        self.particles = []
+        self.particles = ParticleSystem()
         self.time_left = 400
         self.time_tick = 0
         self.global_frame = 0
+        # Molde do início do nível: morte e reset restauram daqui
+        self._start = self._snapshot()
 
-    def restart(self):
-        self.init_level()
-        self.state = self.STATE_PLAY
-
-    def run(self):
-        running = True
-        while running:
-            dt = clock.tick(FPS)
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    running = False
-                if event.type == pygame.KEYDOWN:
-                    if self.state == self.STATE_TITLE:
-                        if event.key == pygame.K_RETURN:
-                            self.restart()
-                    elif self.state == self.STATE_GAMEOVER:
-                        if event.key == pygame.K_RETURN:
-                            self.state = self.STATE_TITLE
-                    elif self.state == self.STATE_WIN:
-                        if event.key == pygame.K_RETURN:
-                            self.state = self.STATE_TITLE
-
-            if self.state == self.STATE_TITLE:
-                self.draw_title()
-            elif self.state == self.STATE_PLAY:
-                self.update_play()
-                self.draw_play()
-            elif self.state == self.STATE_GAMEOVER:
-                self.draw_gameover()
-            elif self.state == self.STATE_WIN:
-                self.draw_win()
-
-            pygame.display.flip()
-
-        pygame.quit()
-        sys.exit()
-
-    # ─── TITLE ────────────────────────────
-    def draw_title(self):
-        self.title_frame += 1
-        screen.fill(SKY_BLUE)
-
-        # Ground
-        ground_y = SCREEN_H - 80
-        pygame.draw.rect(screen, GROUND_BR, (0, ground_y, SCREEN_W, 80))
-        pygame.draw.rect(screen, GROUND_TOP, (0, ground_y, SCREEN_W, 8))
+    def _restart_level(self):
+        """Volta ao molde do início do nível, sem tocar no sorteio nem no placar.
 
-        # Clouds
-        draw_cloud(screen, 150, 100, 1.2)
-        draw_cloud(screen, 500, 70, 0.9)
-        draw_cloud(screen, 700, 120, 1.0)
-
-        # Hills
-        draw_hill(screen, 50, ground_y, 200, 80)
-        draw_hill(screen, 500, ground_y, 300, 100)
-
-        # Bushes
-        draw_bush(screen, 200, ground_y - 5, 1.2)
-        draw_bush(screen, 650, ground_y - 5, 0.8)
-
-        # Title
-        bounce = math.sin(self.title_frame * 0.05) * 8
-        title = self.font_big.render("SUPER ZEBRA", True, WHITE)
-        shadow = self.font_big.render("SUPER ZEBRA", True, BLACK)
-        tx = SCREEN_W // 2 - title.get_width() // 2
-        ty = 100 + bounce
-        screen.blit(shadow, (tx + 3, ty + 3))
-        screen.blit(title, (tx, ty))
-
-        # Subtitle
-        sub = self.font_med.render("Uma aventura listrada!", True, QBLOCK_COL)
-        screen.blit(sub, (SCREEN_W // 2 - sub.get_width() // 2, 175))
-
-        # Zebra no título
-        zebra = draw_zebra_sprite(80, 80, self.title_frame, True, False)
-        screen.blit(zebra, (SCREEN_W // 2 - 40, ground_y - 85))
-
-        # Press enter
-        if (self.title_frame // 30) % 2 == 0:
-            press = self.font_med.render("Pressione ENTER para jogar", True, WHITE)
-            screen.blit(press, (SCREEN_W // 2 - press.get_width() // 2, SCREEN_H - 140))
+        Um nível novo sortearia o quadro de cada moeda ao criá-la, na ordem
+        da lista; o sorteio é refeito igual, então o resultado (e o hash)
+        é o mesmo de montar o nível do zero.
+        """
+        self._restore(self._start)
+        for c in self.coins:
+            c.frame = self.rng.randint(0, 100)
+
+    def _snapshot(self):
+        return WorldState(self.level.snapshot(), self.player.snapshot(), self.cam_x,
+                          [(sc.x, sc.y, sc.vy, sc.timer) for sc in self.spawned_coins],
+                          self.particles.snapshot(), self.time_left, self.time_tick,
+                          self.global_frame, None, None, None)
+
+    def _restore(self, state):
+        self.level.restore(state.level)
+        self.player.restore(state.player)
+        self.cam_x = state.cam_x
+        self.spawned_coins = []
+        for x, y, vy, timer in state.spawned:
+            sc = SpawnedCoin(x, y)
+            sc.vy, sc.timer = vy, timer
+            self.spawned_coins.append(sc)
+        self.particles.restore(state.particles)
+        self.time_left = state.time_left
+        self.time_tick = state.time_tick
+        self.global_frame = state.global_frame
+
+    def snapshot(self):
+        """Estado completo da simulação (para checkpoints e rebobinar).
+
+        Só o estado mutável é copiado: as células da grade mexidas desde a
+        carga, os chunks já gravados, os arrays dos inimigos e partículas e
+        poucos registros. O LevelSource é
+        compartilhado. O WorldState devolvido não muda com o jogo e pode ser
+        restaurado quantas vezes for preciso.
+        """
+        return self._snapshot()._replace(status=self.status, deaths=tuple(self.deaths),
+                                         rng=self.rng.getstate())
+
+    def restore(self, state):
+        """Volta ao estado de `snapshot()`; o hash fica igual ao de lá."""
+        self._restore(state)
+        self.status = state.status
+        self.deaths[:] = state.deaths
+        self.rng.setstate(state.rng)
+        del self.events[:]
+
+    @property
+    def flag(self):
+        return self.level.flag
+
+    def awake_range(self):
+        """Faixa [x0, x1) do mundo em que as entidades ficam acordadas."""
+        if self.active_margin is None:
+            return None
+        cx = int(self.cam_x)
+        return cx - self.active_margin, cx + SCREEN_W + self.active_margin
 
-        # Controls
-        ctrl1 = self.font_sm.render("← → para mover   |   ESPAÇO ou ↑ para pular", True, WHITE)
-        screen.blit(ctrl1, (SCREEN_W // 2 - ctrl1.get_width() // 2, SCREEN_H - 50))
+    def step(self, inputs=NO_INPUT):
+        """Avança a simulação um frame."""
+        del self.events[:]
+        if self.status != self.STATUS_PLAYING:
+            return
+        self._step(inputs)
+        if 'die' in self.events:
+            self.deaths.append(self.player.death_cause)
 
-    # ─── PLAY UPDATE ─────────────────────
-    def update_play(self):
+    def _step(self, inputs):
+        # A moeda gira no passo fixo, não a cada frame desenhado
+        self.level.coin_clock += 1
         if self.player.won:
-            self.player.update([], self.tiles)
+            self.player.update(NO_INPUT, self.grid)
             if self.player.win_timer > 120:
-                self.state = self.STATE_WIN
+                self.status = self.STATUS_WON
             return
 
         if not self.player.alive:
-            self.player.update([], self.tiles)
+            self.player.update(NO_INPUT, self.grid)
             if self.player.death_timer > 90:
                 self.player.lives -= 1
                 if self.player.lives <= 0:
-                    self.state = self.STATE_GAMEOVER
+                    self.status = self.STATUS_GAMEOVER
                 else:
                     lives_save = self.player.lives
                     score_save = self.player.score
                     coins_save = self.player.coins_count
-                    self.init_level()
+                    self._restart_level()
                     self.player.lives = lives_save
                     self.player.score = score_save
                     self.player.coins_count = coins_save
             return
 
-        keys = pygame.key.get_pressed()
         self.global_frame += 1
 
         # Timer
@@ -879,87 +2962,59 @@ class Game:
             self.time_tick = 0
             self.time_left -= 1
             if self.time_left <= 0:
-                self.player.die()
+                self.player.die('time')
 
         # Update player
-        self.player.update(keys, self.tiles)
+        self.player.update(inputs, self.grid)
 
         # Check Q blocks hit from below
-        for t in self.tiles:
+        for t in self.grid.active:
             if t.type == 'qblock' and t.hit and not t.coin_given:
                 t.coin_given = True
                 self.player.coins_count += 1
                 self.player.score += 200
                 self.spawned_coins.append(SpawnedCoin(t.rect.x + 4, t.rect.y - TILE))
-                if snd_coin:
-                    snd_coin.play()
+                self.events.append('coin')
 
             # Bounce animation
             if t.bounce_timer > 0:
                 t.bounce_timer -= 1
+        self.grid.active = [t for t in self.grid.active if t.bounce_timer > 0]
+        profiler.mark('player')
 
         # Update enemies
-        for e in self.enemies:
-            if not e.alive:
-                e.death_timer += 1
+        en = self.enemies
+        en.step(self.grid, self.awake_range())
+
+        # Check if player stomp
+        for i in en.touching(self.player.rect):
+            if not (self.player.alive and en.alive[i]):
                 continue
-            e.frame += 1
-            e.vy += 0.5
-            e.vy = min(e.vy, 8)
-            e.rect.x += int(e.vx)
-
-            # Enemy-tile collision X
-            for t in self.tiles:
-                if e.rect.colliderect(t.rect):
-                    if e.vx > 0:
-                        e.rect.right = t.rect.left
-                    else:
-                        e.rect.left = t.rect.right
-                    e.vx *= -1
-
-            # Fall
-            e.rect.y += int(e.vy)
-            e.on_ground = False
-            for t in self.tiles:
-                if e.rect.colliderect(t.rect):
-                    if e.vy >= 0:
-                        e.rect.bottom = t.rect.top
-                        e.vy = 0
-                        e.on_ground = True
-
-            # Fall off world
-            if e.rect.top > WORLD_H + 50:
-                e.alive = False
-
-            # Check if player stomp
-            if self.player.alive and e.alive:
-                if self.player.rect.colliderect(e.rect):
-                    # Check if stomping (player falling, feet above enemy center)
-                    if self.player.vy > 0 and self.player.rect.bottom < e.rect.centery + 10:
-                        e.alive = False
-                        e.death_timer = 0
-                        self.player.vy = -8
-                        self.player.score += 100
-                        if snd_stomp:
-                            snd_stomp.play()
-                        # Particles
-                        for _ in range(8):
-                            self.particles.append(Particle(e.rect.centerx, e.rect.centery,
-                                                           random.choice([TURTLE_GREEN, TURTLE_SHELL, WHITE])))
-                    else:
-                        self.player.die()
+            centerx = int(en.x[i]) + TILE // 2
+            centery = int(en.y[i]) + TILE // 2
+            # Check if stomping (player falling, feet above enemy center)
+            if self.player.vy > 0 and self.player.rect.bottom < centery + 10:
+                en.alive[i] = False
+                en.death_timer[i] = 0
+                self.player.vy = -8
+                self.player.score += 100
+                self.events.append('stomp')
+                # Particles
+                self.particles.burst(centerx, centery, STOMP_COLORS, STOMP_BURST, self.rng)
+            else:
+                self.player.die()
+        profiler.mark('enemies')
 
-        # Collect coins
-        for c in self.coins:
-            if not c.collected and self.player.rect.colliderect(c.rect):
+        # Collect coins (só as dos chunks em volta do jogador)
+        pr = self.player.rect
+        for c in self.level.coins_in(pr.left - TILE, pr.right + TILE):
+            if not c.collected and pr.colliderect(c.rect):
                 c.collected = True
                 self.player.coins_count += 1
                 self.player.score += 100
-                if snd_coin:
-                    snd_coin.play()
-                for _ in range(5):
-                    self.particles.append(Particle(c.rect.centerx, c.rect.centery,
-                                                   random.choice([COIN_COL, COIN_DARK, WHITE])))
+                self.events.append('coin')
+                self.particles.burst(c.rect.centerx, c.rect.centery,
+                                     COIN_BURST_COLORS, COIN_BURST, self.rng)
 
         # Spawned coins animation
         for sc in self.spawned_coins[:]:
@@ -968,15 +3023,11 @@ class Game:
             sc.timer -= 1
             if sc.timer <= 0:
                 self.spawned_coins.remove(sc)
+        profiler.mark('coins')
 
         # Particles
-        for p in self.particles[:]:
-            p.x += p.vx
-            p.y += p.vy
-            p.vy += 0.2
-            p.timer -= 1
-            if p.timer <= 0:
-                self.particles.remove(p)
+        self.particles.update()
+        profiler.mark('particles')
 
         # Flag
         if self.flag and not self.flag.touched:
@@ -985,178 +3036,1278 @@ class Game:
                 self.player.won = True
                 self.player.score += self.time_left * 10
                 self.player.vx = 0
-                if snd_flag:
-                    snd_flag.play()
+                self.events.append('flag')
 
         # Camera
         target_cam = self.player.rect.centerx - SCREEN_W // 3
         self.cam_x += (target_cam - self.cam_x) * 0.1
-        self.cam_x = max(0, min(self.cam_x, WORLD_W - SCREEN_W))
+        self.cam_x = max(0, min(self.cam_x, self.width - SCREEN_W))
+        profiler.mark('camera')
+
+        # Streaming: carrega à frente da câmera, descarta o que ficou para trás
+        self.level.update(self.cam_x)
+        profiler.mark('stream')
+
+    def summary(self):
+        """Resumo do estado, para testes e comparações."""
+        p = self.player
+        return {
+            'status': self.status,
+            'frame': self.global_frame,
+            'x': p.rect.x, 'y': p.rect.y, 'vx': p.vx, 'vy': p.vy,
+            'alive': p.alive, 'won': p.won,
+            'score': p.score, 'coins': p.coins_count, 'lives': p.lives,
+            'time_left': self.time_left,
+            'enemies_alive': self.enemies.alive_count(),
+        }
+
+    def state_hash(self):
+        """Hash (64 bits) do estado da simulação, igual com ou sem numpy."""
+        h = hashlib.blake2b(digest_size=8)
+        p = self.player
+        h.update(repr(sorted((k, v) for k, v in vars(p).items() if k != 'events')).encode())
+        h.update(repr((self.status, self.time_left, self.time_tick, self.global_frame,
+                       self.cam_x, self.particles.count)).encode())
+        h.update(repr(self.enemies.state()).encode())
+        h.update(repr([(c.x, c.y, c.collected) for c in self.coins]).encode())
+        h.update(bytes(self.grid.types))
+        h.update(repr(self.rng.getstate()).encode())
+        return int.from_bytes(h.digest(), 'little')
 
-    # ─── PLAY DRAW ───────────────────────
-    def draw_play(self):
-        screen.fill(SKY_BLUE)
-        cx = int(self.cam_x)
 
-        # Background decorations (parallax)
-        for hx, hy, hw, hh in BG_HILLS:
-            draw_hill(screen, hx - int(cx * 0.3), hy, hw, hh)
+# ─────────────────────────────────────────────
+# Ambiente vetorizado (RL)
+# ─────────────────────────────────────────────
+# Ações discretas -> entradas
+ACTIONS = (
+    NO_INPUT,
+    Inputs(True, False, False),    # esquerda
+    Inputs(False, True, False),    # direita
+    Inputs(False, False, True),    # pulo
+    Inputs(True, False, True),     # esquerda + pulo
+    Inputs(False, True, True),     # direita + pulo
+)
+OBS_BEHIND_COLS = 4     # colunas do recorte atrás do jogador
+OBS_COLS = 16           # largura do recorte de tiles
+OBS_ENTITIES = 8        # inimigos/moedas mais próximos na observação
+ENTITY_ENEMY, ENTITY_COIN = 1, 2
+ENV_MAX_STEPS = 4000
+
+
+class VecEnv:
+    """N mundos avançados juntos, no estilo dos vector envs do Gym.
+
+    `step(actions)` recebe um índice de ACTIONS por mundo e devolve
+    (obs, rewards, dones, infos). As observações são arrays numpy:
+
+    - 'tiles': (N, fileiras, OBS_COLS) uint8, tipos em volta do jogador;
+    - 'entities': (N, OBS_ENTITIES, 3) float32, (dx, dy) em tiles e tipo;
+    - 'player': (N, 5) float32, x e y em tiles, vx, vy, no chão.
+
+    A recompensa é o ganho de score no passo. Um episódio termina ao
+    perder uma vida ('death', ou 'timeout' se foi o relógio), ao tocar a
+    bandeira ('flag') ou após `max_steps` passos ('timeout'); `infos` traz
+    só os mundos que terminaram. Esses recomeçam sozinhos com a próxima
+    semente, via World.reset, que reaproveita o nível já interpretado.
+    Os arrays devolvidos são reutilizados a cada passo.
+    """
+
+    def __init__(self, n, level_map=LEVEL_MAP, seed=0, max_steps=ENV_MAX_STEPS,
+                 active_margin=ACTIVE_MARGIN):
+        if np is None:
+            raise RuntimeError("VecEnv precisa do numpy")
+        source = level_map if isinstance(level_map, LevelSource) else LevelSource(level_map)
+        self.n = n
+        self.max_steps = max_steps
+        self.worlds = [World(source, seed + i, active_margin) for i in range(n)]
+        self.next_seed = seed + n
+        self.steps = np.zeros(n, np.int64)
+        self.obs = {
+            'tiles': np.zeros((n, source.rows, OBS_COLS), np.uint8),
+            'entities': np.zeros((n, OBS_ENTITIES, 3), np.float32),
+            'player': np.zeros((n, 5), np.float32),
+        }
+        self.rewards = np.zeros(n, np.float32)
+        self.dones = np.zeros(n, bool)
+
+    def reset(self):
+        for w in self.worlds:
+            w.reset(self.next_seed)
+            self.next_seed += 1
+        self.steps[:] = 0
+        for i in range(self.n):
+            self._observe(i)
+        return self.obs
+
+    def step(self, actions):
+        rewards, dones = self.rewards, self.dones
+        infos = {}
+        for i, w in enumerate(self.worlds):
+            before = w.player.score
+            w.step(ACTIONS[actions[i]])
+            self.steps[i] += 1
+            rewards[i] = w.player.score - before
+            events = w.events
+            reason = None
+            if 'flag' in events:
+                reason = 'flag'
+            elif 'die' in events:
+                reason = 'timeout' if w.player.death_cause == 'time' else 'death'
+            elif self.steps[i] >= self.max_steps:
+                reason = 'timeout'
+            dones[i] = reason is not None
+            if reason is not None:
+                infos[i] = {'reason': reason, 'score': w.player.score,
+                            'steps': int(self.steps[i]), 'seed': w.seed}
+                w.reset(self.next_seed)
+                self.next_seed += 1
+                self.steps[i] = 0
+            self._observe(i)
+        return self.obs, rewards, dones, infos
+
+    def _observe(self, i):
+        w = self.worlds[i]
+        p = w.player
+        solid = w.grid.solid
+        rows, cols = solid.shape
+        tiles = self.obs['tiles'][i]
+        c0 = p.rect.x // TILE - OBS_BEHIND_COLS
+        lo, hi = max(c0, 0), min(c0 + OBS_COLS, cols)
+        tiles[:] = 0
+        if lo < hi:
+            tiles[:, lo - c0:hi - c0] = solid[:, lo:hi] & TILE_TYPE_MASK
+
+        px, py = p.rect.x, p.rect.y
+        x0, x1 = c0 * TILE, (c0 + OBS_COLS) * TILE
+        en = w.enemies
+        k = en.count
+        ex, ey = en.x[:k], en.y[:k]
+        near = np.flatnonzero(en.alive[:k] & (ex >= x0) & (ex < x1))
+        found = [(abs(int(ex[j]) - px), int(ex[j]), int(ey[j]), ENTITY_ENEMY) for j in near]
+        found += [(abs(c.x - px), c.x, c.y, ENTITY_COIN)
+                  for c in w.level.coins_in(x0, x1) if not c.collected and x0 <= c.x < x1]
+        found.sort()
+        ents = self.obs['entities'][i]
+        ents[:] = 0
+        for slot, (_, x, y, kind) in enumerate(found[:OBS_ENTITIES]):
+            ents[slot] = ((x - px) / TILE, (y - py) / TILE, kind)
+        self.obs['player'][i] = (px / TILE, py / TILE, p.vx, p.vy, p.on_ground)
 
-        for bx, by, bs in BG_CLOUDS:
-            draw_cloud(screen, bx - int(cx * 0.2), by, bs)
 
-        for bx, by, bs in BG_BUSHES:
-            draw_bush(screen, bx - cx, by, bs)
+# ─────────────────────────────────────────────
+# Replays (gravação de entradas e reprodução)
+# ─────────────────────────────────────────────
+# Arquivo: cabeçalho, corridas RLE de (bits da entrada, frames) e pontos
+# de verificação (frame, hash do estado).
+REPLAY_MAGIC = b'SZRP'
+REPLAY_VERSION = 1
+REPLAY_HEADER = struct.Struct('<4sHQ20sIII')
+REPLAY_RUN = struct.Struct('<BH')
+REPLAY_CHECK = struct.Struct('<IQ')
+REPLAY_CHECK_FRAMES = 60
+INPUT_LEFT, INPUT_RIGHT, INPUT_JUMP = 1, 2, 4
+
+
+def level_digest(level_map):
+    """SHA-1 do mapa, para conferir que o replay roda no mesmo nível."""
+    source = level_map if isinstance(level_map, LevelSource) else LevelSource(level_map)
+    return source.digest()
+
+
+class Replay:
+    """Entradas de uma partida (um World) em corridas RLE, mais a semente.
+
+    A cada REPLAY_CHECK_FRAMES frames a gravação guarda `World.state_hash()`,
+    que a reprodução confere.
+    """
+
+    def __init__(self, seed, level_hash=b'\0' * 20, check_every=REPLAY_CHECK_FRAMES):
+        self.seed = seed
+        self.level_hash = level_hash
+        self.check_every = check_every
+        self.frames = 0
+        self.runs = []
+        self.checks = []
+
+    def record(self, inputs, world=None):
+        bits = (inputs.left and INPUT_LEFT) | (inputs.right and INPUT_RIGHT) | (inputs.jump and INPUT_JUMP)
+        if self.runs and self.runs[-1][0] == bits and self.runs[-1][1] < 0xFFFF:
+            self.runs[-1][1] += 1
+        else:
+            self.runs.append([bits, 1])
+        self.frames += 1
+        if world is not None and self.frames % self.check_every == 0:
+            self.checks.append((self.frames, world.state_hash()))
+
+    def inputs(self):
+        """Gera as entradas gravadas, frame a frame."""
+        for bits, count in self.runs:
+            inputs = Inputs(bool(bits & INPUT_LEFT), bool(bits & INPUT_RIGHT), bool(bits & INPUT_JUMP))
+            for _ in range(count):
+                yield inputs
+
+    def save(self, path):
+        parts = [REPLAY_HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, self.seed, self.level_hash,
+                                    self.frames, len(self.runs), len(self.checks))]
+        parts += [REPLAY_RUN.pack(bits, count) for bits, count in self.runs]
+        parts += [REPLAY_CHECK.pack(frame, h) for frame, h in self.checks]
+        tmp = '%s.%d.tmp' % (path, os.getpid())
+        with open(tmp, 'wb') as f:
+            f.write(b''.join(parts))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        magic, version, seed, level_hash, frames, n_runs, n_checks = REPLAY_HEADER.unpack_from(data)
+        if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+            raise ValueError("%s: não é um replay (versão %d)" % (path, REPLAY_VERSION))
+        rep = cls(seed, level_hash)
+        rep.frames = frames
+        off = REPLAY_HEADER.size
+        for _ in range(n_runs):
+            rep.runs.append(list(REPLAY_RUN.unpack_from(data, off)))
+            off += REPLAY_RUN.size
+        for _ in range(n_checks):
+            rep.checks.append(REPLAY_CHECK.unpack_from(data, off))
+            off += REPLAY_CHECK.size
+        return rep
+
+
+def play_replay(path, level_map=LEVEL_MAP, render=False):
+    """Reproduz um replay sem limite de FPS e confere os hashes.
+
+    Devolve (frames, segundos, lista de frames que divergiram, se o replay
+    foi gravado neste nível).
+    """
+    rep = Replay.load(path)
+    same_level = rep.level_hash == level_digest(level_map)
+    if render:
+        game = Game(level_map=level_map, seed=rep.seed)
+        game.restart()
+        world = game.world
+    else:
+        world = World(level_map, rep.seed)
+    checks = dict(rep.checks)
+    bad = []
+    t0 = time.perf_counter()
+    for frame, inputs in enumerate(rep.inputs(), 1):
+        if render:
+            game.update_play(inputs)
+            game.draw_play()
+            pygame.display.flip()
+            pygame.event.pump()
+        else:
+            world.step(inputs)
+        expected = checks.get(frame)
+        if expected is not None and expected != world.state_hash():
+            bad.append(frame)
+    return rep.frames, time.perf_counter() - t0, bad, same_level
+
+
+def run_replay(args):
+    global audio_enabled
+    audio_enabled = False
+    if args.replay_render:
+        init_display()
+        load_atlas()
+    level_map = open_level(args.level) if args.level else LEVEL_MAP
+    try:
+        frames, secs, bad, same_level = play_replay(args.replay, level_map, args.replay_render)
+    finally:
+        if args.level:
+            level_map.close()
+    if not same_level:
+        print("Aviso: o replay foi gravado em outro nível")
+    print("%d frames em %.2f s (%.0f frames/s)" % (frames, secs, frames / max(secs, 1e-9)))
+    if bad:
+        print("Estado divergiu nos frames: %s" % ', '.join(map(str, bad[:10])))
+    else:
+        print("Todos os pontos de verificação conferem")
+    pygame.quit()
+    return 1 if bad else 0
 
-        # Tiles
-        for t in self.tiles:
-            sx = t.rect.x - cx
-            sy = t.rect.y
-            if sx < -TILE or sx > SCREEN_W + TILE:
-                continue
-            bounce_off = 0
-            if t.bounce_timer > 0:
-                bounce_off = -int(math.sin(t.bounce_timer * 0.4) * 6)
-
-            if t.type == 'ground':
-                pygame.draw.rect(screen, GROUND_BR, (sx, sy + bounce_off, TILE, TILE))
-                pygame.draw.rect(screen, GROUND_TOP, (sx, sy + bounce_off, TILE, 6))
-                pygame.draw.rect(screen, (100, 65, 30), (sx, sy + bounce_off, TILE, TILE), 1)
-            elif t.type == 'brick':
-                screen.blit(brick_surf, (sx, sy + bounce_off))
-            elif t.type == 'qblock':
-                if t.hit:
-                    screen.blit(qblock_hit_surf, (sx, sy + bounce_off))
-                else:
-                    screen.blit(qblock_surf, (sx, sy + bounce_off))
+
+# ─────────────────────────────────────────────
+# HUD (modo retido)
+# ─────────────────────────────────────────────
+HUD_H = 36
+
+
+class Hud:
+    """HUD em modo retido.
+
+    A barra translúcida é montada uma vez. Cada texto fica guardado junto
+    com o valor que mostra e só é rasterizado de novo quando esse valor
+    (ou a cor) muda; nos outros frames o HUD é só uma sequência de blits.
+    """
+
+    def __init__(self):
+        self.bar = None
+        self.widgets = {}
+        self.renders = 0
+
+    def _text(self, name, value, text, color):
+        """Superfície do widget `name`, refeita só se (valor, cor) mudou."""
+        key = (value, color)
+        cached = self.widgets.get(name)
+        if cached is None or cached[0] != key:
+            surf = fonts.render_uncached(text, 'Arial', 22, color, bold=True)
+            self.renders += 1
+            cached = self.widgets[name] = (key, surf)
+        return cached[1]
+
+    def draw(self, surf, w):
+        # Semi-transparent bar
+        if self.bar is None:
+            self.bar = pygame.Surface((SCREEN_W, HUD_H), pygame.SRCALPHA)
+            self.bar.fill((0, 0, 0, 120))
+        surf.blit(self.bar, (0, 0))
+        p = w.player
+
+        # Score
+        surf.blit(self._text('score', p.score, f"SCORE: {p.score:06d}", WHITE), (15, 7))
 
         # Coins
-        for c in self.coins:
+        surf.blit(coin_sprite(22, 22, w.global_frame), (240, 5))
+        surf.blit(self._text('coins', p.coins_count, f"x {p.coins_count:02d}", COIN_COL), (265, 7))
+
+        # Lives
+        surf.blit(self._text('lives', p.lives, f"VIDAS: {p.lives}", WHITE), (400, 7))
+
+        # Time
+        time_color = RED if w.time_left < 60 else WHITE
+        time_txt = self._text('time', w.time_left, f"TEMPO: {w.time_left:03d}", time_color)
+        surf.blit(time_txt, (SCREEN_W - 170, 7))
+
+        # World
+        world_txt = self._text('world', None, "MUNDO 1-1", WHITE)
+        surf.blit(world_txt, (SCREEN_W // 2 - world_txt.get_width() // 2 + 80, 7))
+
+
+# ─────────────────────────────────────────────
+# Apresentação por retângulos sujos
+# ─────────────────────────────────────────────
+DIRTY_MAX_RECTS = 96  # acima disso um flip inteiro sai mais barato
+
+
+class DirtyPresenter:
+    """Junta as áreas alteradas no frame e envia só elas com display.update.
+
+    `invalidate()` marca a tela inteira (câmera rolando, troca de tela,
+    overlay ligado): o próximo `present()` faz um flip completo.
+    """
+
+    def __init__(self):
+        self.rects = []
+        self.full = True
+
+    def add(self, rect):
+        if self.full:
+            return
+        self.rects.append(rect)
+        if len(self.rects) > DIRTY_MAX_RECTS:
+            self.invalidate()
+
+    def invalidate(self):
+        self.full = True
+        del self.rects[:]
+
+    def present(self):
+        if self.full:
+            pygame.display.flip()
+        elif self.rects:
+            pygame.display.update(self.rects)
+        self.full = False
+        del self.rects[:]
+
+
+class StaticScreen:
+    """Tela de fundo fixo (montado uma vez) com poucos elementos móveis.
+
+    A cada frame, `begin` repõe o fundo onde os elementos estavam no frame
+    anterior; os desenhos feitos por `blit`/`fill` marcam as áreas novas no
+    presenter. `front` são as partes fixas que ficam por cima de elementos
+    móveis (ex.: os textos sobre o confete), redesenhadas só onde preciso.
+    """
+
+    def __init__(self, background, presenter, front=()):
+        self.background = background
+        self.presenter = presenter
+        self.front = front
+        self.prev = []
+        self.fresh = True
+
+    def begin(self, surf):
+        if self.fresh or self.presenter.full:
+            surf.blit(self.background, (0, 0))
+            self.presenter.invalidate()
+            self.fresh = False
+        else:
+            for r in self.prev:
+                surf.blit(self.background, r, r)
+                self.presenter.add(r)
+        self.prev = []
+
+    def _mark(self, rect):
+        self.prev.append(rect)
+        self.presenter.add(rect)
+        return rect
+
+    def blit(self, surf, image, pos):
+        return self._mark(surf.blit(image, pos))
+
+    def fill(self, surf, color, rect):
+        return self._mark(pygame.draw.rect(surf, color, rect))
+
+    def restore_front(self, surf, rects):
+        """Redesenha as partes fixas de cima dentro de `rects`."""
+        for image, pos in self.front:
+            area = image.get_rect(topleft=pos)
+            for r in rects:
+                clip = area.clip(r)
+                if clip:
+                    surf.blit(image, clip, clip.move(-area.x, -area.y))
+
+
+# ─────────────────────────────────────────────
+# Game Class
+# ─────────────────────────────────────────────
+class Game:
+    STATE_TITLE = 0
+    STATE_PLAY = 1
+    STATE_GAMEOVER = 2
+    STATE_WIN = 3
+
+    def __init__(self, surface=None, level_map=LEVEL_MAP, seed=None):
+        """`surface` permite desenhar fora da janela (por padrão, a tela)."""
+        self.screen = surface if surface is not None else screen
+        self.level_map = level_map
+        self.seed = seed
+        self.state = self.STATE_TITLE
+        self.title_frame = 0
+        self.tile_layer = None
+        self.warmup = default_warmup()
+        self.presenter = DirtyPresenter()
+        self.hud = Hud()
+        # Fundo fixo da tela de título / fim de jogo / vitória em exibição
+        self.static = None
+        self.static_state = None
+        # Gravação da partida atual (Replay) e para onde salvá-la
+        self.record_path = None
+        self.replay = None
+        self.fx_rng = random.Random(seed)
+        # Limite de frames desenhados (0 = sem limite); a simulação fica
+        # sempre em FPS passos por segundo
+        self.max_fps = FPS
+        # Estado antes do último passo, para interpolar o desenho
+        self._prev = None
+        # (world, câmera) do último draw_play e as áreas dos sprites dele
+        self._play_view = None
+        self._play_rects = []
+        # O nível só é montado ao começar a jogar
+        self.world = None
+        # Trilha de fundo durante a partida (None = sem música)
+        self.music = MusicStreamer(MUSIC_THEME)
+
+    # Fontes resolvidas no primeiro uso (o registro guarda cada uma)
+    @property
+    def font_big(self):
+        return fonts.font('Arial', 52, bold=True)
+
+    @property
+    def font_med(self):
+        return fonts.font('Arial', 28, bold=True)
+
+    @property
+    def font_sm(self):
+        return fonts.font('Arial', 20)
+
+    @property
+    def font_hud(self):
+        return fonts.font('Arial', 22, bold=True)
+
+    def init_level(self):
+        # Semente sempre concreta, para a partida poder ser gravada
+        seed = self.seed if self.seed is not None else random.getrandbits(32)
+        self.world = World(self.level_map, seed)
+        self.fx_rng = random.Random(seed)
+        if self.record_path:
+            self.replay = Replay(seed, level_digest(self.level_map))
+
+    def restart(self):
+        self.init_level()
+        self._prev = None
+        self.state = self.STATE_PLAY
+        if self.music:
+            self.music.start()
+
+    def step(self):
+        """Avança o estado atual em um passo fixo de SIM_DT_MS."""
+        if self.state == self.STATE_PLAY:
+            p = self.world.player
+            self._prev = (self.world, self.world.cam_x, p.rect.x, p.rect.y)
+            self.update_play()
+        elif self.state == self.STATE_TITLE:
+            self.title_frame += 1
+
+    def run(self):
+        """Loop com acumulador: simulação a FPS fixo, desenho livre.
+
+        O tempo real de cada volta entra no acumulador, que é gasto em passos
+        de SIM_DT_MS. Com desenho lento, vários passos rodam por frame (pulo
+        de frames) até MAX_CATCHUP_STEPS; o que sobra além disso é descartado
+        e contado como perda, e aí sim o jogo fica mais lento. Com desenho
+        rápido, o resto do acumulador interpola câmera, jogador e inimigos.
+        """
+        running = True
+        acc = 0.0
+        last = time.perf_counter()
+        while running:
+            clock.tick(self.max_fps)
+            now = time.perf_counter()
+            acc += (now - last) * 1000
+            last = now
+            profiler.begin_frame()
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+                if event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_F3:
+                        profiler.toggle_overlay()
+                        self.presenter.invalidate()
+                    elif self.state == self.STATE_TITLE:
+                        if event.key == pygame.K_RETURN:
+                            self.restart()
+                    elif self.state == self.STATE_GAMEOVER:
+                        if event.key == pygame.K_RETURN:
+                            self.state = self.STATE_TITLE
+                    elif self.state == self.STATE_WIN:
+                        if event.key == pygame.K_RETURN:
+                            self.state = self.STATE_TITLE
+            profiler.mark('events')
+            if profiler.overlay:
+                self.presenter.invalidate()
+
+            steps = 0
+            while acc >= SIM_DT_MS and steps < MAX_CATCHUP_STEPS:
+                self.step()
+                acc -= SIM_DT_MS
+                steps += 1
+            dropped = int(acc // SIM_DT_MS)
+            acc -= dropped * SIM_DT_MS
+            profiler.count_steps(steps, dropped)
+
+            if self.state == self.STATE_TITLE:
+                self.draw_title()
+            elif self.state == self.STATE_PLAY:
+                self.draw_play(acc / SIM_DT_MS)
+            elif self.state == self.STATE_GAMEOVER:
+                self.draw_gameover()
+            elif self.state == self.STATE_WIN:
+                self.draw_win()
+            profiler.mark('draw')
+            profiler.draw(self.screen)
+
+            self.presenter.present()
+            profiler.mark('flip')
+            if self.warmup.pending:
+                self.warmup.run()
+            profiler.end_frame()
+
+        if self.music:
+            self.music.stop()
+        pygame.quit()
+        sys.exit()
+
+    # ─── TITLE ────────────────────────────
+    def _static_screen(self, build):
+        """Fundo fixo da tela atual, montado uma vez ao entrar nela."""
+        if self.static is None or self.static_state != self.state:
+            background, front = build()
+            self.static = StaticScreen(background, self.presenter, front)
+            self.static_state = self.state
+        return self.static
+
+    def _build_title(self):
+        bg = pygame.Surface((SCREEN_W, SCREEN_H))
+        bg.fill(SKY_BLUE)
+
+        # Ground
+        ground_y = TITLE_GROUND_Y
+        pygame.draw.rect(bg, GROUND_BR, (0, ground_y, SCREEN_W, 80))
+        pygame.draw.rect(bg, GROUND_TOP, (0, ground_y, SCREEN_W, 8))
+
+        # Clouds, hills, bushes
+        for layer in TITLE_LAYERS:
+            layer.draw(bg, 0)
+
+        # Subtitle
+        sub = self.font_med.render("Uma aventura listrada!", True, QBLOCK_COL)
+        bg.blit(sub, (SCREEN_W // 2 - sub.get_width() // 2, 175))
+
+        # Controls
+        ctrl1 = self.font_sm.render("← → para mover   |   ESPAÇO ou ↑ para pular", True, WHITE)
+        bg.blit(ctrl1, (SCREEN_W // 2 - ctrl1.get_width() // 2, SCREEN_H - 50))
+        return bg, ()
+
+    def draw_title(self):
+        static = self._static_screen(self._build_title)
+        static.begin(self.screen)
+
+        # Title
+        bounce = math.sin(self.title_frame * 0.05) * 8
+        title = fonts.render("SUPER ZEBRA", 'Arial', 52, WHITE, bold=True)
+        shadow = fonts.render("SUPER ZEBRA", 'Arial', 52, BLACK, bold=True)
+        tx = SCREEN_W // 2 - title.get_width() // 2
+        ty = 100 + bounce
+        static.blit(self.screen, shadow, (tx + 3, ty + 3))
+        static.blit(self.screen, title, (tx, ty))
+
+        # Zebra no título
+        zebra = zebra_sprite(80, 80, self.title_frame, True, False)
+        static.blit(self.screen, zebra, (SCREEN_W // 2 - 40, TITLE_GROUND_Y - 85))
+
+        # Press enter
+        if (self.title_frame // 30) % 2 == 0:
+            press = fonts.render("Pressione ENTER para jogar", 'Arial', 28, WHITE, bold=True)
+            static.blit(self.screen, press, (SCREEN_W // 2 - press.get_width() // 2, SCREEN_H - 140))
+
+    # ─── PLAY UPDATE ─────────────────────
+    def update_play(self, inputs=None):
+        if inputs is None:
+            inputs = Inputs.from_keys(pygame.key.get_pressed())
+        self.world.step(inputs)
+        if self.replay is not None:
+            self.replay.record(inputs, self.world)
+        for name in self.world.events:
+            play_sound(name)
+        profiler.mark('sound')
+        if self.world.status != World.STATUS_PLAYING:
+            self.save_replay()
+            if self.music:
+                self.music.stop()
+        if self.world.status == World.STATUS_WON:
+            self.state = self.STATE_WIN
+        elif self.world.status == World.STATUS_GAMEOVER:
+            self.state = self.STATE_GAMEOVER
+
+    def save_replay(self):
+        """Grava a partida em `record_path` (a última partida sobrescreve)."""
+        if self.replay is not None and self.replay.frames:
+            self.replay.save(self.record_path)
+        self.replay = None
+
+    # ─── PLAY DRAW ───────────────────────
+    def draw_play(self, alpha=1.0):
+        """Desenha o mundo; `alpha` < 1 interpola entre o passo anterior e o atual."""
+        w = self.world
+        self.screen.fill(SKY_BLUE)
+        prev = self._prev
+        lerp = alpha < 1.0 and prev is not None and prev[0] is w
+        if lerp:
+            back = 1.0 - alpha
+            cx = int(w.cam_x - (w.cam_x - prev[1]) * back)
+        else:
+            cx = int(w.cam_x)
+        # Câmera rolando: a tela inteira muda e vai num flip. Parada, só as
+        # áreas dos sprites (deste frame e do anterior) e o HUD são enviados
+        if self._play_view != (w, cx):
+            self.presenter.invalidate()
+            self._play_view = (w, cx)
+        rects = []
+
+        # Background decorations (parallax)
+        for layer in BG_LAYERS:
+            layer.draw(self.screen, cx)
+        profiler.mark('background')
+
+        # Tiles
+        if self.tile_layer is None or self.tile_layer.grid is not w.grid:
+            self.tile_layer = TileLayer(w.grid)
+        rects += self.tile_layer.draw(self.screen, cx)
+        profiler.mark('tiles')
+
+        # Coins (só as da tela; todas giram pelo mesmo relógio)
+        tick = w.level.coin_clock
+        for c in w.level.coins_in(cx - TILE, cx + SCREEN_W + TILE):
             if c.collected:
                 continue
-            c.frame += 1
             sx = c.x - cx
-            sy = c.y
             if -TILE < sx < SCREEN_W + TILE:
-                coin_s = draw_coin_sprite(TILE, TILE, c.frame)
-                screen.blit(coin_s, (sx, sy))
+                coin_s = coin_sprite(TILE, TILE, c.frame + tick)
+                rects.append(self.screen.blit(coin_s, (sx, c.y)))
 
         # Spawned coins
-        for sc in self.spawned_coins:
+        for sc in w.spawned_coins:
             sx = sc.x - cx
-            coin_s = draw_coin_sprite(TILE, TILE, self.global_frame)
-            screen.blit(coin_s, (sx, sc.y))
+            coin_s = coin_sprite(TILE, TILE, w.global_frame)
+            rects.append(self.screen.blit(coin_s, (sx, sc.y)))
 
         # Enemies
-        for e in self.enemies:
-            if not e.alive and e.death_timer > 30:
-                continue
-            sx = e.rect.x - cx
-            sy = e.rect.y
-            if -TILE < sx < SCREEN_W + TILE:
-                ts = draw_turtle_sprite(TILE, TILE, e.frame, e.alive)
-                screen.blit(ts, (sx, sy))
+        en = w.enemies
+        for i in en.visible(cx):
+            alive = bool(en.alive[i])
+            ts = turtle_sprite(TILE, TILE, int(en.frame[i]), alive)
+            ex = en.x[i]
+            if lerp and alive:
+                # Posição anterior ≈ atual - velocidade (só erra numa virada)
+                ex = ex - en.vx[i] * back
+            rects.append(self.screen.blit(ts, (int(ex) - cx, int(en.y[i]))))
 
         # Flag
-        if self.flag:
-            sx = self.flag.x - cx
-            sy = self.flag.y
-            fs = draw_flag_sprite(self.flag.h)
-            screen.blit(fs, (sx, sy))
+        if w.flag:
+            sx = w.flag.x - cx
+            sy = w.flag.y
+            fs = flag_sprite(w.flag.h)
+            self.screen.blit(fs, (sx, sy))
 
         # Particles
-        for p in self.particles:
-            px = int(p.x - cx)
-            py = int(p.y)
-            pygame.draw.circle(screen, p.color, (px, py), 3)
+        rects.append(w.particles.draw(self.screen, cx))
 
         # Player
-        self.player.draw(screen, cx)
+        if lerp:
+            r = w.player.rect
+            at = (int(r.x - (r.x - prev[2]) * back), int(r.y - (r.y - prev[3]) * back))
+            rects.append(w.player.draw(self.screen, cx, at))
+        else:
+            rects.append(w.player.draw(self.screen, cx))
+        profiler.mark('sprites')
 
         # HUD
         self.draw_hud()
+        rects.append(pygame.Rect(0, 0, SCREEN_W, HUD_H))
+        profiler.mark('hud')
 
-    def draw_hud(self):
-        # Semi-transparent bar
-        hud_bar = pygame.Surface((SCREEN_W, 36), pygame.SRCALPHA)
-        hud_bar.fill((0, 0, 0, 120))
-        screen.blit(hud_bar, (0, 0))
+        rects = [r for r in rects if r]
+        for r in self._play_rects + rects:
+            self.presenter.add(r)
+        self._play_rects = rects
 
-        # Score
-        score_txt = self.font_hud.render(f"SCORE: {self.player.score:06d}", True, WHITE)
-        screen.blit(score_txt, (15, 7))
-
-        # Coins
-        coin_icon = draw_coin_sprite(22, 22, self.global_frame)
-        screen.blit(coin_icon, (240, 5))
-        coin_txt = self.font_hud.render(f"x {self.player.coins_count:02d}", True, COIN_COL)
-        screen.blit(coin_txt, (265, 7))
-
-        # Lives
-        lives_txt = self.font_hud.render(f"VIDAS: {self.player.lives}", True, WHITE)
-        screen.blit(lives_txt, (400, 7))
-
-        # Time
-        time_color = RED if self.time_left < 60 else WHITE
-        time_txt = self.font_hud.render(f"TEMPO: {self.time_left:03d}", True, time_color)
-        screen.blit(time_txt, (SCREEN_W - 170, 7))
-
-        # World
-        world_txt = self.font_hud.render("MUNDO 1-1", True, WHITE)
-        screen.blit(world_txt, (SCREEN_W // 2 - world_txt.get_width() // 2 + 80, 7))
+    def draw_hud(self):
+        self.hud.draw(self.screen, self.world)
 
     # ─── GAME OVER ───────────────────────
-    def draw_gameover(self):
-        screen.fill(BLACK)
+    def _build_gameover(self):
+        w = self.world
+        bg = pygame.Surface((SCREEN_W, SCREEN_H))
+        bg.fill(BLACK)
         go_txt = self.font_big.render("GAME OVER", True, RED)
-        screen.blit(go_txt, (SCREEN_W // 2 - go_txt.get_width() // 2, SCREEN_H // 2 - 60))
+        bg.blit(go_txt, (SCREEN_W // 2 - go_txt.get_width() // 2, SCREEN_H // 2 - 60))
 
-        score_txt = self.font_med.render(f"Score Final: {self.player.score}", True, WHITE)
-        screen.blit(score_txt, (SCREEN_W // 2 - score_txt.get_width() // 2, SCREEN_H // 2 + 20))
-
-        if (pygame.time.get_ticks() // 500) % 2 == 0:
-            retry = self.font_sm.render("Pressione ENTER para voltar ao menu", True, QBLOCK_COL)
-            screen.blit(retry, (SCREEN_W // 2 - retry.get_width() // 2, SCREEN_H // 2 + 80))
+        score_txt = self.font_med.render(f"Score Final: {w.player.score}", True, WHITE)
+        bg.blit(score_txt, (SCREEN_W // 2 - score_txt.get_width() // 2, SCREEN_H // 2 + 20))
 
         # Zebra triste
-        zebra = draw_zebra_sprite(60, 60, 0, True, False)
-        screen.blit(zebra, (SCREEN_W // 2 - 30, SCREEN_H // 2 - 150))
+        zebra = zebra_sprite(60, 60, 0, True, False)
+        bg.blit(zebra, (SCREEN_W // 2 - 30, SCREEN_H // 2 - 150))
+        return bg, ()
+
+    def draw_gameover(self):
+        static = self._static_screen(self._build_gameover)
+        static.begin(self.screen)
+        if (pygame.time.get_ticks() // 500) % 2 == 0:
+            retry = fonts.render("Pressione ENTER para voltar ao menu", 'Arial', 20, QBLOCK_COL)
+            static.blit(self.screen, retry, (SCREEN_W // 2 - retry.get_width() // 2, SCREEN_H // 2 + 80))
 
     # ─── WIN ─────────────────────────────
-    def draw_win(self):
-        screen.fill(SKY_BLUE)
-        # Confetti
-        for _ in range(30):
-            px = random.randint(0, SCREEN_W)
-            py = random.randint(0, SCREEN_H)
-            color = random.choice([RED, COIN_COL, FLAG_GREEN, WHITE, ORANGE, QBLOCK_COL])
-            size = random.randint(3, 8)
-            pygame.draw.rect(screen, color, (px, py, size, size))
+    def _build_win(self):
+        w = self.world
+        bg = pygame.Surface((SCREEN_W, SCREEN_H))
+        bg.fill(SKY_BLUE)
 
         win_txt = self.font_big.render("VOCÊ VENCEU!", True, COIN_COL)
         shadow = self.font_big.render("VOCÊ VENCEU!", True, BLACK)
         wx = SCREEN_W // 2 - win_txt.get_width() // 2
         wy = SCREEN_H // 2 - 80
-        screen.blit(shadow, (wx + 3, wy + 3))
-        screen.blit(win_txt, (wx, wy))
-
-        score_txt = self.font_med.render(f"Score Final: {self.player.score}", True, WHITE)
-        screen.blit(score_txt, (SCREEN_W // 2 - score_txt.get_width() // 2, SCREEN_H // 2))
+        score_txt = self.font_med.render(f"Score Final: {w.player.score}", True, WHITE)
+        coins_txt = self.font_med.render(f"Moedas: {w.player.coins_count}", True, COIN_COL)
+        # Textos fixos, mas desenhados por cima do confete
+        front = [
+            (shadow, (wx + 3, wy + 3)),
+            (win_txt, (wx, wy)),
+            (score_txt, (SCREEN_W // 2 - score_txt.get_width() // 2, SCREEN_H // 2)),
+            (coins_txt, (SCREEN_W // 2 - coins_txt.get_width() // 2, SCREEN_H // 2 + 40)),
+        ]
+        for image, pos in front:
+            bg.blit(image, pos)
+        return bg, front
 
-        coins_txt = self.font_med.render(f"Moedas: {self.player.coins_count}", True, COIN_COL)
-        screen.blit(coins_txt, (SCREEN_W // 2 - coins_txt.get_width() // 2, SCREEN_H // 2 + 40))
+    def draw_win(self):
+        static = self._static_screen(self._build_win)
+        static.begin(self.screen)
+        # Confetti
+        confetti = []
+        rng = self.fx_rng
+        for _ in range(30):
+            px = rng.randint(0, SCREEN_W)
+            py = rng.randint(0, SCREEN_H)
+            color = rng.choice([RED, COIN_COL, FLAG_GREEN, WHITE, ORANGE, QBLOCK_COL])
+            size = rng.randint(3, 8)
+            confetti.append(static.fill(self.screen, color, (px, py, size, size)))
+        static.restore_front(self.screen, confetti)
 
-        zebra = draw_zebra_sprite(80, 80, pygame.time.get_ticks() // 50, True, True)
-        screen.blit(zebra, (SCREEN_W // 2 - 40, SCREEN_H // 2 - 180))
+        zebra = zebra_sprite(80, 80, pygame.time.get_ticks() // 50, True, True)
+        static.blit(self.screen, zebra, (SCREEN_W // 2 - 40, SCREEN_H // 2 - 180))
 
         if (pygame.time.get_ticks() // 500) % 2 == 0:
-            retry = self.font_sm.render("Pressione ENTER para voltar ao menu", True, WHITE)
-            screen.blit(retry, (SCREEN_W // 2 - retry.get_width() // 2, SCREEN_H // 2 + 100))
+            retry = fonts.render("Pressione ENTER para voltar ao menu", 'Arial', 20, WHITE)
+            static.blit(self.screen, retry, (SCREEN_W // 2 - retry.get_width() // 2, SCREEN_H // 2 + 100))
+
+
+# ─────────────────────────────────────────────
+# Benchmark de startup
+# ─────────────────────────────────────────────
+def startup_bench():
+    """Mede o tempo até o primeiro frame, fase a fase, e depois o aquecimento."""
+    timer = StartupTimer()
+    timer.mark('import')
+    init_display()
+    timer.mark('display')
+    game = Game()
+    timer.mark('game')
+    game.draw_title()
+    timer.mark('first_frame')
+    pygame.display.flip()
+    timer.mark('flip')
+
+    total = timer.total_ms()
+    print("Tempo até o primeiro frame: %.1f ms (orçamento %d ms)" % (total, STARTUP_BUDGET_MS))
+    for name, ms in timer.phases:
+        print("  %-14s %8.1f ms" % (name, ms))
+    game.warmup.finish()
+    print("Aquecimento em segundo plano: %.1f ms" % sum(ms for _, ms in game.warmup.done))
+    for name, ms in game.warmup.done:
+        print("  %-14s %8.1f ms" % (name, ms))
+    pygame.quit()
+    return 0 if total <= STARTUP_BUDGET_MS else 1
+
+
+# ─────────────────────────────────────────────
+# Benchmark de frames (update_play / draw_play)
+# ─────────────────────────────────────────────
+BENCH_PHASES = ('update', 'draw')
+BENCH_PERCENTILES = (50, 95, 99)
+
+
+def synthetic_level(width=400, n_enemies=200, n_coins=300, seed=0):
+    """Gera um LEVEL_MAP com `width` colunas, buracos, plataformas, inimigos e moedas."""
+    rng = random.Random(seed)
+    rows = [['.'] * width for _ in range(LEVEL_H)]
+    ground = LEVEL_H - 1
+    rows[ground] = ['G'] * width
+    col = 20
+    while col < width - 20:
+        for c in range(col, col + rng.randint(2, 3)):
+            rows[ground][c] = '.'
+        col += rng.randint(12, 30)
+    for col in range(15, width - 20, rng.randint(9, 14)):
+        row = rng.choice((8, 11))
+        for c in range(col, col + rng.randint(3, 8)):
+            rows[row][c] = rng.choice('GBBQ') if row == 8 else 'G'
+    free = [(r, c) for r in range(2, ground) for c in range(12, width - 10) if rows[r][c] == '.']
+    rng.shuffle(free)
+    for r, c in free[:n_enemies]:
+        rows[r][c] = 'E'
+    for r, c in free[n_enemies:n_enemies + n_coins]:
+        rows[r][c] = 'C'
+    rows[5][width - 8] = 'F'
+    return [''.join(row) for row in rows]
+
+
+def bench_inputs(frames):
+    """Sequência fixa de entradas: anda para a direita, pula e às vezes volta."""
+    return [Inputs(left=(f // 150) % 4 == 3, right=(f // 150) % 4 != 3,
+                   jump=(f // 29) % 2 == 0) for f in range(frames)]
+
+
+def _percentile(ordered, q):
+    """Percentil por posição (nearest-rank) de uma lista já ordenada."""
+    if not ordered:
+        return 0.0
+    k = max(int(math.ceil(q / 100 * len(ordered))) - 1, 0)
+    return ordered[k]
+
+
+def bench_level(level_map, frames=1200, warm_frames=60, seed=0):
+    """Roda `frames` frames de jogo numa superfície fora da tela.
+
+    Devolve, por fase, percentis do tempo de frame em ms, o saldo de blocos
+    de memória alocados por frame (`sys.getallocatedblocks`) e quantas
+    coletas do gc caíram dentro da fase.
+    """
+    game = Game(pygame.Surface((SCREEN_W, SCREEN_H)), level_map, seed)
+    game.warmup.finish()
+    game.restart()
+    phases = {name: {'ms': [], 'blocks': [], 'gc': 0} for name in BENCH_PHASES}
+    current = [None]
+
+    def on_gc(stage, info):
+        if stage == 'start' and current[0] is not None:
+            phases[current[0]]['gc'] += 1
+
+    steps = (('update', game.update_play), ('draw', lambda inputs: game.draw_play()))
+    restarts = 0
+    gc.callbacks.append(on_gc)
+    try:
+        for f, inputs in enumerate(bench_inputs(warm_frames + frames)):
+            if game.state != Game.STATE_PLAY:
+                game.restart()
+                restarts += 1
+            measure = f >= warm_frames
+            for name, fn in steps:
+                current[0] = name if measure else None
+                b0 = sys.getallocatedblocks()
+                t0 = time.perf_counter()
+                fn(inputs)
+                t1 = time.perf_counter()
+                b1 = sys.getallocatedblocks()
+                current[0] = None
+                if measure:
+                    phases[name]['ms'].append((t1 - t0) * 1000)
+                    phases[name]['blocks'].append(b1 - b0)
+    finally:
+        gc.callbacks.remove(on_gc)
+
+    result = {'restarts': restarts, 'phases': {}}
+    for name, data in phases.items():
+        ms = sorted(data['ms'])
+        blocks = sorted(data['blocks'])
+        stats = {'p%d_ms' % q: round(_percentile(ms, q), 4) for q in BENCH_PERCENTILES}
+        stats['mean_ms'] = round(sum(ms) / len(ms), 4)
+        stats['max_ms'] = round(ms[-1], 4)
+        stats['blocks_p50'] = _percentile(blocks, 50)
+        stats['blocks_max'] = blocks[-1]
+        stats['blocks_total'] = sum(blocks)
+        stats['gc_collections'] = data['gc']
+        result['phases'][name] = stats
+    return result
+
+
+def run_bench(args):
+    """Mede a fase 1 e um nível sintético; grava o resultado em JSON."""
+    global audio_enabled
+    audio_enabled = False  # sem mixer: o benchmark mede só jogo e desenho
+    pygame.font.init()
+    levels = {
+        'fase1': LEVEL_MAP,
+        'sintetico': synthetic_level(args.bench_width, args.bench_enemies,
+                                     args.bench_coins, args.bench_seed),
+    }
+    report = {
+        'version': 1,
+        'python': sys.version.split()[0],
+        'pygame': pygame.version.ver,
+        'numpy': np.__version__ if np is not None else None,
+        'frames': args.bench_frames,
+        'seed': args.bench_seed,
+        'levels': {},
+    }
+    for name, level_map in levels.items():
+        res = bench_level(level_map, args.bench_frames, seed=args.bench_seed)
+        res['width'] = len(level_map[0])
+        res['enemies'] = sum(row.count('E') for row in level_map)
+        res['coins'] = sum(row.count('C') for row in level_map)
+        report['levels'][name] = res
+        print("%s (%d colunas, %d inimigos, %d moedas, %d reinícios)"
+              % (name, res['width'], res['enemies'], res['coins'], res['restarts']))
+        for phase, st in res['phases'].items():
+            print("  %-7s p50 %7.3f  p95 %7.3f  p99 %7.3f ms  blocos/frame %5d  gc %d"
+                  % (phase, st['p50_ms'], st['p95_ms'], st['p99_ms'],
+                     st['blocks_p50'], st['gc_collections']))
+    with open(args.bench_out, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    print("Resultado gravado em %s" % args.bench_out)
+    pygame.quit()
+    return 0
+
+
+# ─────────────────────────────────────────────
+# Simulação em lote (vários processos)
+# ─────────────────────────────────────────────
+BATCH_MAX_FRAMES = 36000   # acima disso a partida conta como 'timeout'
+BATCH_POLICIES = ('random', 'bot', 'replay')
+_batch_levels = {}
+
+
+def batch_level(spec):
+    """Nível de um job: 'fase1', 'sint:LARGURA:INIMIGOS:MOEDAS[:SEMENTE]' ou arquivo."""
+    level = _batch_levels.get(spec)
+    if level is None:
+        if spec == 'fase1':
+            level = LEVEL_MAP
+        elif spec.startswith('sint:'):
+            level = synthetic_level(*[int(v) for v in spec.split(':')[1:]])
+        else:
+            level = open_level(spec)
+        _batch_levels[spec] = level
+    return level
+
+
+def _batch_level_digest(spec):
+    """Digest do nível de um job sem deixar arquivo aberto (nem em cache) no pai.
+
+    Um arquivo aberto antes do pool seria herdado pelos processos filhos;
+    cada um abre o seu em batch_level.
+    """
+    if spec == 'fase1' or spec.startswith('sint:'):
+        return level_digest(batch_level(spec))
+    with open_level(spec) as source:
+        return source.digest()
+
+
+def random_policy(seed, hold=20):
+    """Entradas aleatórias, trocadas a cada `hold` frames."""
+    rng = random.Random(seed)
+    inputs = NO_INPUT
+    frame = 0
+    while True:
+        if frame % hold == 0:
+            inputs = Inputs(rng.random() < 0.15, rng.random() < 0.8, rng.random() < 0.4)
+        yield inputs
+        frame += 1
+
+
+def bot_policy():
+    """Bot simples: corre para a direita e pula paredes, buracos e tartarugas."""
+    inputs = Inputs(False, True, False)
+    while True:
+        world = yield inputs
+        p = world.player
+        grid = world.grid
+        front = (p.rect.right + TILE // 2) // TILE
+        rows = range(max(p.rect.top // TILE, 0), min((p.rect.bottom - 1) // TILE + 1, grid.rows))
+        wall = front < grid.cols and any(grid.code(front, r) for r in rows)
+        below = range(min(p.rect.bottom // TILE, grid.rows), grid.rows)
+        gap = all(not grid.code(c, r) for c in (front, front + 1) if c < grid.cols for r in below)
+        ahead = pygame.Rect(p.rect.right, p.rect.top - TILE, 3 * TILE, p.rect.h + 2 * TILE)
+        enemy = bool(world.enemies.touching(ahead))
+        rising = not p.on_ground and p.vy < 0
+        inputs = Inputs(False, True, rising or (p.on_ground and (wall or gap or enemy)))
+
+
+def simulate_run(job):
+    """Roda uma partida headless (um job do lote) e devolve o resultado."""
+    level = batch_level(job['level'])
+    seed = job['seed']
+    if job['policy'] == 'replay':
+        rep = Replay.load(job['replay'])
+        seed = rep.seed
+        policy = rep.inputs()
+        send = lambda world: next(policy, NO_INPUT)
+    else:
+        if job['policy'] == 'random':
+            policy = random_policy(job.get('policy_seed', seed))
+        else:
+            policy = bot_policy()
+        first = [next(policy)]
+        send = lambda world: first.pop() if first else policy.send(world)
+    world = World(level, seed)
+    t0 = time.perf_counter()
+    frames = 0
+    max_frames = job.get('max_frames', BATCH_MAX_FRAMES)
+    while world.status == World.STATUS_PLAYING and frames < max_frames:
+        world.step(send(world))
+        frames += 1
+    secs = time.perf_counter() - t0
+    status = world.status if world.status != World.STATUS_PLAYING else 'timeout'
+    return {
+        'level': job['level'], 'seed': seed, 'policy': job['policy'],
+        'status': status, 'frames': frames, 'secs': secs,
+        'score': world.player.score, 'deaths': list(world.deaths), 'pid': os.getpid(),
+    }
+
+
+def summarize_batch(results):
+    """Taxa de conclusão, mortes por causa, scores e passos/s por processo."""
+    scores = sorted(r['score'] for r in results)
+    deaths = {}
+    for r in results:
+        for cause in r['deaths']:
+            deaths[cause] = deaths.get(cause, 0) + 1
+    workers = {}
+    for r in results:
+        frames, secs = workers.get(r['pid'], (0, 0.0))
+        workers[r['pid']] = (frames + r['frames'], secs + r['secs'])
+    by_policy = {}
+    for r in results:
+        runs, won = by_policy.get(r['policy'], (0, 0))
+        by_policy[r['policy']] = (runs + 1, won + (r['status'] == World.STATUS_WON))
+    n = len(results)
+    return {
+        'runs': n,
+        'frames': sum(r['frames'] for r in results),
+        'completion_rate': sum(r['status'] == World.STATUS_WON for r in results) / n if n else 0.0,
+        'completion_by_policy': {k: won / runs for k, (runs, won) in by_policy.items()},
+        'status': {s: sum(r['status'] == s for r in results)
+                   for s in (World.STATUS_WON, World.STATUS_GAMEOVER, 'timeout')},
+        'deaths_by_cause': deaths,
+        'score': {
+            'min': scores[0] if scores else 0, 'max': scores[-1] if scores else 0,
+            'mean': sum(scores) / n if n else 0.0,
+            'p25': _percentile(scores, 25), 'p50': _percentile(scores, 50),
+            'p75': _percentile(scores, 75),
+        },
+        'steps_per_sec_per_worker': {str(pid): round(f / s) if s else 0
+                                     for pid, (f, s) in workers.items()},
+    }
+
+
+def batch_jobs(args):
+    jobs = []
+    for level in args.batch_levels:
+        for seed in range(args.batch_seeds):
+            for policy in args.batch_policy:
+                if policy == 'replay':
+                    continue
+                jobs.append({'level': level, 'seed': seed, 'policy': policy,
+                             'policy_seed': seed, 'max_frames': args.batch_max_frames})
+    digests = {}
+    for path in args.batch_replays or ():
+        # Cada replay roda no nível em que foi gravado
+        level_hash = Replay.load(path).level_hash
+        for level in args.batch_levels:
+            if level not in digests:
+                digests[level] = _batch_level_digest(level)
+            if digests[level] == level_hash:
+                break
+        else:
+            raise ValueError("%s: o replay não foi gravado em nenhum dos níveis de "
+                             "--batch-levels (%s)" % (path, ', '.join(args.batch_levels)))
+        jobs.append({'level': level, 'seed': 0, 'policy': 'replay',
+                     'replay': path, 'max_frames': args.batch_max_frames})
+    return jobs
+
+
+def run_batch(args):
+    """Distribui os jobs num pool de processos (sem janela nem mixer)."""
+    from concurrent.futures import ProcessPoolExecutor
+    try:
+        jobs = batch_jobs(args)
+    except ValueError as e:
+        print(e)
+        return 1
+    workers = args.batch_workers or os.cpu_count() or 1
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(simulate_run, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+    wall = time.perf_counter() - t0
+    summary = summarize_batch(results)
+    summary['workers'] = workers
+    summary['wall_secs'] = round(wall, 3)
+    print("%d partidas, %d frames em %.1f s com %d processos (%.0f frames/s no total)"
+          % (summary['runs'], summary['frames'], wall, workers, summary['frames'] / max(wall, 1e-9)))
+    print("Concluídas: %.1f%%  %s" % (100 * summary['completion_rate'], summary['status']))
+    print("Mortes por causa: %s" % summary['deaths_by_cause'])
+    print("Score: %s" % summary['score'])
+    if args.batch_out:
+        with open(args.batch_out, 'w') as f:
+            json.dump({'summary': summary, 'runs': results}, f, indent=2, sort_keys=True)
+        print("Resultado gravado em %s" % args.batch_out)
+    return 0
 
 
 # ─────────────────────────────────────────────
 # Main
 # ─────────────────────────────────────────────
+def seed_arg(text):
+    """Semente do argparse: cabe no campo de 64 bits sem sinal do replay."""
+    seed = int(text)
+    if not 0 <= seed < 2 ** 64:
+        raise argparse.ArgumentTypeError("a semente deve estar entre 0 e 2**64-1")
+    return seed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SUPER ZEBRA")
+    parser.add_argument('--startup-bench', action='store_true',
+                        help="mede o tempo até o primeiro frame e sai")
+    parser.add_argument('--level', metavar='ARQUIVO',
+                        help="joga um nível em arquivo (texto ou compilado, lido sob demanda)")
+    parser.add_argument('--compile-level', nargs=2, metavar=('ORIGEM', 'DESTINO'),
+                        help="compila um nível (fase1, sint:... ou arquivo texto) para o "
+                             "formato binário e sai")
+    parser.add_argument('--seed', type=seed_arg, help="semente fixa das partidas")
+    parser.add_argument('--record', metavar='ARQUIVO',
+                        help="grava as entradas da última partida num replay")
+    parser.add_argument('--replay', metavar='ARQUIVO',
+                        help="reproduz um replay sem limite de FPS e confere o estado")
+    parser.add_argument('--replay-render', action='store_true',
+                        help="desenha o replay na janela (senão roda sem vídeo)")
+    parser.add_argument('--batch', action='store_true',
+                        help="roda muitas partidas headless em paralelo e resume")
+    parser.add_argument('--batch-levels', nargs='+', default=['fase1'],
+                        help="fase1, sint:LARGURA:INIMIGOS:MOEDAS[:SEMENTE] ou arquivos")
+    parser.add_argument('--batch-seeds', type=int, default=16,
+                        help="sementes 0..N-1 por nível e política")
+    parser.add_argument('--batch-policy', nargs='+', default=['random', 'bot'],
+                        choices=BATCH_POLICIES)
+    parser.add_argument('--batch-replays', nargs='*', metavar='ARQUIVO')
+    parser.add_argument('--batch-max-frames', type=int, default=BATCH_MAX_FRAMES)
+    parser.add_argument('--batch-workers', type=int, help="processos (padrão: um por núcleo)")
+    parser.add_argument('--batch-out', metavar='ARQUIVO', help="grava o resultado em JSON")
+    parser.add_argument('--no-music', action='store_true',
+                        help="joga sem a música de fundo")
+    parser.add_argument('--fps', type=int, default=FPS,
+                        help="limite de frames desenhados (0 = sem limite); "
+                             "a simulação roda sempre a %d passos/s" % FPS)
+    parser.add_argument('--bake-atlas', nargs='?', const=ATLAS_PATH, metavar='BASE',
+                        help="desenha todos os sprites no atlas (BASE.bmp + BASE.idx) e sai")
+    parser.add_argument('--trace', metavar='ARQUIVO',
+                        help="grava um trace do Chrome (trace-event JSON) ao sair")
+    parser.add_argument('--bench', action='store_true',
+                        help="mede update_play/draw_play fora da tela e sai")
+    parser.add_argument('--bench-frames', type=int, default=1200)
+    parser.add_argument('--bench-width', type=int, default=400,
+                        help="colunas do nível sintético")
+    parser.add_argument('--bench-enemies', type=int, default=200)
+    parser.add_argument('--bench-coins', type=int, default=300)
+    parser.add_argument('--bench-seed', type=int, default=0)
+    parser.add_argument('--bench-out', default='bench.json',
+                        help="arquivo JSON com o resultado")
+    args = parser.parse_args(argv)
+    if args.startup_bench:
+        sys.exit(startup_bench())
+    if args.bench:
+        sys.exit(run_bench(args))
+    if args.replay:
+        sys.exit(run_replay(args))
+    if args.batch:
+        sys.exit(run_batch(args))
+    if args.compile_level:
+        src, dst = args.compile_level
+        with compile_level(batch_level(src), dst) as level:
+            print("%s: %dx%d tiles, %d inimigos, %d moedas, %d trechos de chão, bandeira %s"
+                  % (dst, level.cols, level.rows, level.n_spawns, level.n_coins,
+                     len(level.ground_spans), "h=%d" % level.flag[2] if level.flag else "nenhuma"))
+        sys.exit(0)
+    if args.bake_atlas:
+        n, (w, h) = bake_atlas(args.bake_atlas)
+        print("Atlas com %d sprites (%dx%d) gravado em %s.bmp/.idx" % (n, w, h, args.bake_atlas))
+        sys.exit(0)
+
+    init_display()
+    level_map = open_level(args.level) if args.level else LEVEL_MAP
+    game = Game(level_map=level_map, seed=args.seed)
+    game.record_path = args.record
+    game.max_fps = args.fps
+    if args.no_music:
+        game.music = None
+    if args.trace:
+        profiler.start_trace()
+    try:
+        game.run()
+    finally:
+        game.save_replay()
+        if args.level:
+            level_map.close()
+        if args.trace:
+            n = profiler.export_trace(args.trace)
+            print("Trace com %d eventos gravado em %s" % (n, args.trace))
+            print("Passos simulados: %d (%d sem desenho, %d descartados)"
+                  % (profiler.sim_steps, profiler.skipped, profiler.dropped))
+
+
 if __name__ == "__main__":
-    game = Game()
-    game.run()
+    main()
@@ -0,0 +1,158 @@
+"""Testes da simulação headless: inimigos adormecidos e snapshots do World."""
+
+from collections import namedtuple
+
+import pytest
+
+import super_zebra as sz
+
+MARGIN = 40
+CAM_X = 400
+COL0 = 10  # coluna da primeira tartaruga, dentro da faixa acordada em CAM_X
+FAR_COL = 60  # primeira tartaruga fora da faixa da câmera no começo da fase
+
+# Caminho do EnemySystem.step em teste, com quantas tartarugas o forçam e
+# a lista (preenchida pelo espião) dos métodos que de fato rodaram
+Path = namedtuple('Path', 'name n_enemies calls')
+
+
+def flat_level(n_enemies, col0=COL0, cols=200):
+    """Chão contínuo com `n_enemies` tartarugas lado a lado a partir de `col0`."""
+    rows = [['.'] * cols for _ in range(sz.LEVEL_H)]
+    rows[-1] = ['G'] * cols
+    for i in range(n_enemies):
+        rows[-2][col0 + i] = 'E'
+    return [''.join(r) for r in rows]
+
+
+@pytest.fixture(params=['scalar', 'batched'])
+def path(request, monkeypatch):
+    if request.param == 'batched':
+        if sz.np is None:
+            pytest.skip("o caminho em lote precisa de numpy")
+        n = sz.ENEMY_BATCH_MIN
+    else:
+        n = 1
+    calls = []
+    for name in ('_step_batched', '_step_scalar'):
+        real = getattr(sz.EnemySystem, name)
+
+        def spy(self, grid, awake, real=real, name=name):
+            calls.append(name)
+            return real(self, grid, awake)
+        monkeypatch.setattr(sz.EnemySystem, name, spy)
+    return Path(request.param, n, calls)
+
+
+def assert_path(path):
+    assert set(path.calls) == {'_step_' + path.name}
+
+
+@pytest.fixture
+def world(path):
+    """World com margem pequena e a câmera parada em CAM_X."""
+    w = sz.World(flat_level(path.n_enemies), seed=1, active_margin=MARGIN)
+    w.cam_x = CAM_X
+    return w
+
+
+def step_enemies(w, n=1):
+    for _ in range(n):
+        w.enemies.step(w.grid, w.awake_range())
+
+
+def state(en, i):
+    return int(en.x[i]), int(en.y[i]), float(en.vx[i]), int(en.frame[i]), bool(en.alive[i])
+
+
+def test_enemy_freezes_outside_awake_range(world, path):
+    en = world.enemies
+    assert int(en.x[0]) == COL0 * sz.TILE
+    x0, _ = world.awake_range()
+    # Anda para a esquerda até sair da faixa acordada
+    for _ in range(200):
+        step_enemies(world)
+        if not x0 - sz.TILE < en.x[0]:
+            break
+    else:
+        pytest.fail("a tartaruga não saiu da faixa acordada")
+    frozen = state(en, 0)
+    step_enemies(world, 100)
+    assert state(en, 0) == frozen
+    assert_path(path)
+
+
+def test_enemy_resumes_when_range_returns(world, path):
+    en = world.enemies
+    x0, _ = world.awake_range()
+    while x0 - sz.TILE < en.x[0]:
+        step_enemies(world)
+    x, y, vx, frame, alive = state(en, 0)
+    step_enemies(world, 50)
+
+    # A câmera volta: continua do mesmo ponto, na mesma direção
+    world.cam_x = 0
+    step_enemies(world)
+    assert state(en, 0) == (x + int(vx), y, vx, frame + 1, alive)
+    step_enemies(world, 10)
+    assert int(en.x[0]) == x + 11 * int(vx)
+    assert en.vx[0] == vx
+    assert_path(path)
+
+
+def test_enemies_inside_range_keep_moving(world, path):
+    en = world.enemies
+    i = min(5, en.count - 1)  # x = (COL0 + i) * TILE, dentro da faixa
+    before = state(en, i)
+    step_enemies(world, 10)
+    assert int(en.x[i]) != before[0]
+    assert int(en.frame[i]) == before[3] + 10
+    assert_path(path)
+
+
+def test_world_step_wakes_enemy_entering_margin(path):
+    """Pelo World.step: a câmera segue a zebra e acorda a tartaruga ao chegar perto."""
+    w = sz.World(flat_level(path.n_enemies, FAR_COL), seed=1, active_margin=MARGIN)
+    en = w.enemies
+    x0, y0, vx0, frame0, _ = state(en, 0)
+    run = sz.Inputs(False, True, False)
+    steps = 0
+    while True:
+        lo, hi = w.awake_range()
+        if lo - sz.TILE < en.x[0] < hi:
+            break
+        w.step(run)
+        steps += 1
+        # Dormindo: não cai, não anda e não anima
+        assert state(en, 0)[:4] == (x0, y0, vx0, frame0)
+        assert steps < 2000, "a câmera não alcançou a tartaruga"
+    assert steps > 0 and w.cam_x > 0
+    for _ in range(10):
+        w.step(run)
+    assert int(en.x[0]) < x0
+    assert int(en.frame[0]) == frame0 + 10
+    assert w.player.alive
+    assert w.level.coin_clock == steps + 10
+    assert_path(path)
+
+
+def test_restore_checkpoint_after_reset():
+    """Checkpoint com mais chunks que o molde do início, restaurado após reset()."""
+    cols = 2000
+    rows = ['.' * cols] * (sz.LEVEL_H - 1) + ['G' * cols]
+    w = sz.World(rows, seed=1)
+    run = sz.Inputs(False, True, False)
+    for _ in range(1500):
+        w.step(run)
+    cp = w.snapshot()
+    expected = w.state_hash()
+    assert w.player.rect.x // sz.TILE > sz.STREAM_AHEAD_COLS + sz.SCREEN_W // sz.TILE
+
+    w.reset()
+    w.restore(cp)
+    assert w.state_hash() == expected
+    col = w.player.rect.centerx // sz.TILE
+    assert w.grid.code(col, sz.LEVEL_H - 1) != 0
+    for _ in range(120):
+        w.step(run)
+    assert w.player.alive